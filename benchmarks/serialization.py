@@ -0,0 +1,56 @@
+# Encoding cost of a notes listing envelope, stdlib json vs orjson.
+# Run from the project root: python -m benchmarks.serialization
+import json
+import platform
+import timeit
+from datetime import datetime
+import orjson
+from fastapi.responses import JSONResponse, ORJSONResponse
+from schemas.note import NotesListResponse
+
+PAGE_SIZE = 100
+DESCRIPTION_LENGTH = 2000
+ROUNDS = 200
+
+
+def make_page() -> NotesListResponse:
+    notes = [
+        {
+            "note_id": note_id,
+            "title": f"Note {note_id}",
+            "description": "lorem ipsum " * (DESCRIPTION_LENGTH // 12),
+            "tag": "tag",
+            "note_subject": "subject",
+            "timestamp": datetime(2024, 1, 1, 12, 30, 15, 123456),
+            "author_id": 1,
+        }
+        for note_id in range(PAGE_SIZE)
+    ]
+    return NotesListResponse(
+        status=True, detail="ok", total_count=PAGE_SIZE, data=notes, next_cursor=None
+    )
+
+
+def main():
+    page = make_page()
+    # What FastAPI hands the response class after response_model serialization
+    content = page.model_dump(mode="json")
+
+    results = {
+        "model_dump(mode=json)": lambda: page.model_dump(mode="json"),
+        "JSONResponse": lambda: JSONResponse(content),
+        "ORJSONResponse": lambda: ORJSONResponse(content),
+    }
+    print(f"{PAGE_SIZE} notes, {DESCRIPTION_LENGTH} char descriptions, {ROUNDS} rounds")
+    # orjson's speed differs a lot between releases, quote it with the numbers
+    print(f"Python {platform.python_version()}, orjson {orjson.__version__}")
+    for name, fn in results.items():
+        seconds = timeit.timeit(fn, number=ROUNDS)
+        print(f"{name:24} {seconds / ROUNDS * 1e6:10.1f} us/op")
+
+    # Both encoders must produce the same document
+    assert json.loads(JSONResponse(content).body) == json.loads(ORJSONResponse(content).body)
+
+
+if __name__ == "__main__":
+    main()
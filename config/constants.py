@@ -22,6 +22,11 @@ ERROR_DELETE_NOTE = "Failed to delete note."
 ERROR_INTERNAL_SERVER = "An internal server error occurred."
 ERROR_DATABASE_ERROR = "A database error occurred."
 ERROR_UNEXPECTED_ERROR = "An unexpected error occurred."
+ERROR_INVALID_CURSOR = "Invalid pagination cursor."
+ERROR_NOTES_SEARCHING = "An error occurred while searching notes."
+ERROR_FACETS_FETCHING = "An error occurred while fetching note facets."
+ERROR_AUTOCOMPLETE = "An error occurred while looking up suggestions."
+ERROR_HASHING_BUSY = "Server is busy, please retry shortly."
 
 
 # Success Messages
@@ -38,6 +43,10 @@ SUCCESS_NOTE_CREATED = "Note created successfully."
 SUCCESS_NOTE_UPDATED = "Note updated successfully."
 SUCCESS_NOTE_DELETED = "Note deleted successfully."
 SUCCESS_NOTES_FETCHED = "Notes retrieved successfully."
+SUCCESS_NOTES_SEARCHED = "Search results retrieved successfully."
+SUCCESS_FACETS_FETCHED = "Note facets retrieved successfully."
+SUCCESS_AUTOCOMPLETE_FETCHED = "Suggestions retrieved successfully."
+SUCCESS_METRICS_FETCHED = "Metrics retrieved successfully."
 
 # API-related constants
 API_PREFIX = f"/api/{API_VERSION}"
@@ -1,4 +1,4 @@
-from decouple import config
+from decouple import config, Csv
 
 # Environment-specific constants
 SECRET_KEY = config("SECRET_KEY", default="your_secret_key")
@@ -8,6 +8,92 @@ ACCESS_TOKEN_EXPIRE_MINUTES = config(
 )
 DATABASE_URL = config("DATABASE_URL")
 
+# Read replicas (comma separated URLs) for read-only procedures. A user who
+# just wrote keeps reading from the primary for READ_YOUR_WRITES_SECONDS.
+DATABASE_REPLICA_URLS = config("DATABASE_REPLICA_URLS", default="", cast=Csv())
+READ_YOUR_WRITES_SECONDS = config("READ_YOUR_WRITES_SECONDS", default=5, cast=float)
+
+# Response encoder: "orjson" (falls back to "json" when orjson is not installed) or "json"
+JSON_RESPONSE = config("JSON_RESPONSE", default="orjson")
+
+# Response compression: encodings in order of preference (zstd and br need the
+# zstandard/brotli packages), bodies smaller than the minimum are sent as is
+COMPRESSION_ENCODINGS = config("COMPRESSION_ENCODINGS", default="zstd,br,gzip", cast=Csv())
+COMPRESSION_MINIMUM_SIZE = config("COMPRESSION_MINIMUM_SIZE", default=1024, cast=int)
+GZIP_LEVEL = config("GZIP_LEVEL", default=6, cast=int)
+ZSTD_LEVEL = config("ZSTD_LEVEL", default=3, cast=int)
+BROTLI_QUALITY = config("BROTLI_QUALITY", default=4, cast=int)
+COMPRESSION_CACHE_SIZE = config("COMPRESSION_CACHE_SIZE", default=256, cast=int)
+COMPRESSION_CACHE_TTL = config("COMPRESSION_CACHE_TTL", default=30, cast=float)
+
+# Apply pending migrations (python -m migrations upgrade) at startup
+AUTO_MIGRATE = config("AUTO_MIGRATE", default=False, cast=bool)
+
+# Connection pool, per engine and per worker process. Recycle connections
+# well before MySQL's wait_timeout closes them on the server side.
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=5, cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=10, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30, cast=float)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", default=1800, cast=int)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=True, cast=bool)
+
+# Async database access (needs an async driver, e.g. aiomysql)
+DB_ASYNC = config("DB_ASYNC", default=False, cast=bool)
+# Derived from DATABASE_URL when left empty
+ASYNC_DATABASE_URL = config("ASYNC_DATABASE_URL", default="")
+
+# Password hashing pool (0 workers = one per CPU core)
+HASH_WORKERS = config("HASH_WORKERS", default=0, cast=int)
+HASH_QUEUE_SIZE = config("HASH_QUEUE_SIZE", default=64, cast=int)
+
+# Cache backend: memory, mmap (shared by workers on one host) or redis.
+# With the memory backend, CACHE_INVALIDATION_URL (a Redis URL) broadcasts
+# invalidations to the other workers.
+CACHE_BACKEND = config("CACHE_BACKEND", default="memory")
+CACHE_REDIS_URL = config("CACHE_REDIS_URL", default="redis://localhost:6379/0")
+CACHE_INVALIDATION_URL = config("CACHE_INVALIDATION_URL", default="")
+CACHE_SHM_PATH = config("CACHE_SHM_PATH", default="/dev/shm/fastapi-notes-cache")
+CACHE_SHM_SLOTS = config("CACHE_SHM_SLOTS", default=16384, cast=int)
+CACHE_SHM_SLOT_SIZE = config("CACHE_SHM_SLOT_SIZE", default=4096, cast=int)
+
+# Authenticated principal cache (size 0 disables it)
+PRINCIPAL_CACHE_SIZE = config("PRINCIPAL_CACHE_SIZE", default=10000, cast=int)
+PRINCIPAL_CACHE_TTL = config("PRINCIPAL_CACHE_TTL", default=60, cast=float)
+
+# Read-through cache for find_one (size 0 disables it)
+NOTE_CACHE_SIZE = config("NOTE_CACHE_SIZE", default=10000, cast=int)
+NOTE_CACHE_TTL = config("NOTE_CACHE_TTL", default=300, cast=float)
+
+# Cache for notes listing pages, the TTL bounds staleness across workers
+NOTES_PAGE_CACHE_SIZE = config("NOTES_PAGE_CACHE_SIZE", default=1000, cast=int)
+NOTES_PAGE_CACHE_TTL = config("NOTES_PAGE_CACHE_TTL", default=30, cast=float)
+
+# TTL for remembered misses (deleted notes, deleted users), kept short
+NEGATIVE_CACHE_TTL = config("NEGATIVE_CACHE_TTL", default=10, cast=float)
+
+# Seconds between reloads of the SQLite stand-in's in-process search index
+# (it also follows this worker's note writes as they happen)
+SEARCH_INDEX_REFRESH_SECONDS = config(
+    "SEARCH_INDEX_REFRESH_SECONDS", default=30, cast=float
+)
+
+# Characters of description shown around the first match in search results
+SEARCH_SNIPPET_LENGTH = config("SEARCH_SNIPPET_LENGTH", default=160, cast=int)
+
+# Seconds between reloads of the tag/subject autocomplete index (it also
+# follows this worker's note writes as they happen)
+AUTOCOMPLETE_REFRESH_SECONDS = config(
+    "AUTOCOMPLETE_REFRESH_SECONDS", default=30, cast=float
+)
+
+# Rows fetched per round trip by the NDJSON export
+EXPORT_BATCH_SIZE = config("EXPORT_BATCH_SIZE", default=500, cast=int)
+
+# Seconds between recounts of the maintained notes total
+NOTE_COUNT_RECONCILE_SECONDS = config(
+    "NOTE_COUNT_RECONCILE_SECONDS", default=60, cast=float
+)
+
 # Other configuration variables
 HOST = config("HOST", default="http://localhost:8000")
 API_VERSION = "v1"
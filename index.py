@@ -1,17 +1,52 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from routes.auth import auth
 from routes.user import user
 from routes.note import note
-from config.settings import API_VERSION
+from routes.metrics import metrics
+from config.db import USE_SQLITE, engine, async_engine
+from config.settings import (
+    API_VERSION,
+    AUTO_MIGRATE,
+    COMPRESSION_ENCODINGS,
+    COMPRESSION_MINIMUM_SIZE,
+)
+from migrations import upgrade_on_startup
+from utils.cache import invalidation_bus
+from utils.compression import CompressionMiddleware
+from utils.hashing import hashing_executor
+from utils.responses import default_response_class
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The SQLite stand-in always starts from a migrated schema
+    if USE_SQLITE or AUTO_MIGRATE:
+        await upgrade_on_startup(engine, async_engine)
+    if invalidation_bus is not None:
+        invalidation_bus.start()
+    yield
+    if invalidation_bus is not None:
+        await invalidation_bus.stop()
+    hashing_executor.shutdown()
+
 
 app = FastAPI(
     title="FastAPI",
     description="API with JWT Authentication",
     version=API_VERSION,
     openapi_url="/fastapi.json",
+    lifespan=lifespan,
+    default_response_class=default_response_class,
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MINIMUM_SIZE,
+    encodings=COMPRESSION_ENCODINGS,
+)
 
 app.include_router(auth)
 app.include_router(user)
 app.include_router(note)
+app.include_router(metrics)
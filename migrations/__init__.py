@@ -0,0 +1,98 @@
+import importlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# Each file in versions/ named NNNN_description.py defines UP and DOWN,
+# dicts of dialect name -> list of SQL statements. Applied versions are
+# recorded in the schema_migrations table.
+VERSIONS_DIR = Path(__file__).parent / "versions"
+VERSION_FILE_PATTERN = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    module: ModuleType
+
+    def statements(self, direction: str, dialect: str) -> list[str]:
+        return getattr(self.module, direction).get(dialect, [])
+
+
+def discover() -> list[Migration]:
+    migrations = []
+    for path in sorted(VERSIONS_DIR.glob("*.py")):
+        match = VERSION_FILE_PATTERN.match(path.name)
+        if match:
+            module = importlib.import_module(f"migrations.versions.{path.stem}")
+            migrations.append(Migration(int(match.group(1)), match.group(2), module))
+    return migrations
+
+
+def _ensure_version_table(connection: Connection):
+    connection.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, "
+            "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        )
+    )
+
+
+def applied_versions(connection: Connection) -> set[int]:
+    _ensure_version_table(connection)
+    rows = connection.execute(text("SELECT version FROM schema_migrations"))
+    return {row[0] for row in rows}
+
+
+def current_version(connection: Connection) -> int:
+    return max(applied_versions(connection), default=0)
+
+
+def upgrade(connection: Connection, target: Optional[int] = None) -> list[Migration]:
+    applied = applied_versions(connection)
+    done = []
+    for migration in discover():
+        if migration.version in applied:
+            continue
+        if target is not None and migration.version > target:
+            break
+        for statement in migration.statements("UP", connection.dialect.name):
+            connection.execute(text(statement))
+        connection.execute(
+            text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+            {"version": migration.version, "name": migration.name},
+        )
+        done.append(migration)
+    return done
+
+
+def downgrade(connection: Connection, target: int) -> list[Migration]:
+    applied = applied_versions(connection)
+    done = []
+    for migration in reversed(discover()):
+        if migration.version <= target or migration.version not in applied:
+            continue
+        for statement in migration.statements("DOWN", connection.dialect.name):
+            connection.execute(text(statement))
+        connection.execute(
+            text("DELETE FROM schema_migrations WHERE version = :version"),
+            {"version": migration.version},
+        )
+        done.append(migration)
+    return done
+
+
+async def upgrade_on_startup(engine, async_engine=None):
+    with engine.begin() as connection:
+        upgrade(connection)
+    # An in-memory SQLite database is private to its engine, so the async
+    # engine needs its own copy of the schema (a no-op for shared databases)
+    if async_engine is not None:
+        async with async_engine.begin() as connection:
+            await connection.run_sync(upgrade)
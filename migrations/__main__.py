@@ -0,0 +1,34 @@
+import argparse
+import sys
+from config.db import engine
+from migrations import current_version, downgrade, upgrade
+from migrations.explain import check_plans
+
+parser = argparse.ArgumentParser(prog="python -m migrations")
+commands = parser.add_subparsers(dest="command", required=True)
+upgrade_parser = commands.add_parser("upgrade", help="apply pending migrations")
+upgrade_parser.add_argument("target", type=int, nargs="?")
+downgrade_parser = commands.add_parser("downgrade", help="revert down to a version")
+downgrade_parser.add_argument("target", type=int)
+commands.add_parser("current", help="print the applied schema version")
+commands.add_parser("explain", help="check procedure query plans use their indexes")
+args = parser.parse_args()
+
+if args.command == "upgrade":
+    with engine.begin() as connection:
+        for migration in upgrade(connection, args.target):
+            print(f"Applied {migration.version:04d}_{migration.name}")
+elif args.command == "downgrade":
+    with engine.begin() as connection:
+        for migration in downgrade(connection, args.target):
+            print(f"Reverted {migration.version:04d}_{migration.name}")
+elif args.command == "current":
+    with engine.connect() as connection:
+        print(current_version(connection))
+elif args.command == "explain":
+    with engine.connect() as connection:
+        failures = check_plans(connection)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(failures)} plan check(s) failed" if failures else "All plan checks passed")
+    sys.exit(1 if failures else 0)
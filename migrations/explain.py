@@ -0,0 +1,180 @@
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from repositories.note import NOTE_COLUMNS
+from repositories.sqlite import PROCEDURES
+
+
+# The statement a procedure runs (with sample arguments) and the index its
+# plan must use. index=None marks statements that scan by design (e.g. the
+# exact count), for which only the absence of a filesort is checked.
+@dataclass(frozen=True)
+class PlanCheck:
+    procedure: str
+    query: str
+    params: dict
+    index: Optional[str]
+
+
+PLAN_CHECKS = [
+    PlanCheck(
+        "GetUserByEmail",
+        "SELECT user_id FROM users WHERE email = :email",
+        {"email": "user@example.com"},
+        "ix_users_email",
+    ),
+    PlanCheck(
+        "GetUserById",
+        "SELECT user_id FROM users WHERE user_id = :user_id",
+        {"user_id": 1},
+        "PRIMARY",
+    ),
+    PlanCheck("GetAllUsers", "SELECT user_id FROM users ORDER BY user_id", {}, None),
+    PlanCheck(
+        "UpdateUser",
+        "SELECT user_id FROM users WHERE user_id = :user_id",
+        {"user_id": 1},
+        "PRIMARY",
+    ),
+    PlanCheck(
+        "DeleteUser",
+        "SELECT id FROM tokens WHERE user_id = :user_id",
+        {"user_id": 1},
+        "ix_tokens_user_id",
+    ),
+    PlanCheck(
+        "DeleteUser",
+        "SELECT note_id FROM notes WHERE author_id = :user_id",
+        {"user_id": 1},
+        "ix_notes_author_id_timestamp_note_id",
+    ),
+    PlanCheck(
+        "FindAllNotes",
+        PROCEDURES["FindAllNotes"][0],
+        {"limit": 20, "offset": 0},
+        "ix_notes_timestamp_note_id",
+    ),
+    PlanCheck(
+        "FindNotesAfter",
+        PROCEDURES["FindNotesAfter"][0],
+        {"cursor_ts": "2024-01-01 00:00:00", "cursor_id": 1, "limit": 20},
+        "ix_notes_timestamp_note_id",
+    ),
+    PlanCheck(
+        "find_all (tag)",
+        f"SELECT {NOTE_COLUMNS} FROM notes WHERE tag = :tag "
+        "ORDER BY timestamp DESC, note_id DESC LIMIT :limit OFFSET :offset",
+        {"tag": "tag", "limit": 20, "offset": 0},
+        "ix_notes_tag_timestamp",
+    ),
+    PlanCheck(
+        "find_all (note_subject)",
+        f"SELECT {NOTE_COLUMNS} FROM notes WHERE note_subject = :note_subject "
+        "ORDER BY timestamp DESC, note_id DESC LIMIT :limit OFFSET :offset",
+        {"note_subject": "subject", "limit": 20, "offset": 0},
+        "ix_notes_note_subject_timestamp",
+    ),
+    PlanCheck(
+        "find_all (author_id)",
+        f"SELECT {NOTE_COLUMNS} FROM notes WHERE author_id = :author_id "
+        "ORDER BY timestamp DESC, note_id DESC LIMIT :limit OFFSET :offset",
+        {"author_id": 1, "limit": 20, "offset": 0},
+        "ix_notes_author_id_timestamp_note_id",
+    ),
+    PlanCheck(
+        "mine (keyset)",
+        f"SELECT {NOTE_COLUMNS} FROM notes WHERE author_id = :author_id "
+        "AND (timestamp, note_id) < (:cursor_ts, :cursor_id) "
+        "ORDER BY timestamp DESC, note_id DESC LIMIT :limit OFFSET :offset",
+        {
+            "author_id": 1,
+            "cursor_ts": "2024-01-01 00:00:00",
+            "cursor_id": 1,
+            "limit": 20,
+            "offset": 0,
+        },
+        "ix_notes_author_id_timestamp_note_id",
+    ),
+    PlanCheck(
+        "mine (count)",
+        "SELECT COUNT(*) FROM notes WHERE author_id = :author_id",
+        {"author_id": 1},
+        "ix_notes_author_id_timestamp_note_id",
+    ),
+    PlanCheck(
+        "find_all (timestamp range)",
+        f"SELECT {NOTE_COLUMNS} FROM notes "
+        "WHERE timestamp >= :since AND timestamp < :until "
+        "ORDER BY timestamp DESC, note_id DESC LIMIT :limit OFFSET :offset",
+        {"since": "2024-01-01", "until": "2024-02-01", "limit": 20, "offset": 0},
+        "ix_notes_timestamp_note_id",
+    ),
+    PlanCheck("CountAllNotes", PROCEDURES["CountAllNotes"][0], {}, None),
+    PlanCheck(
+        "FindOneNote",
+        PROCEDURES["FindOneNote"][0],
+        {"note_id": 1},
+        "PRIMARY",
+    ),
+    PlanCheck(
+        "UpdateNote",
+        "SELECT note_id FROM notes WHERE note_id = :note_id AND author_id = :author_id",
+        {"note_id": 1, "author_id": 1},
+        "PRIMARY",
+    ),
+    PlanCheck(
+        "DeleteNote",
+        "SELECT note_id FROM notes WHERE note_id = :note_id AND author_id = :author_id",
+        {"note_id": 1, "author_id": 1},
+        "PRIMARY",
+    ),
+    PlanCheck(
+        "NoteFacets",
+        PROCEDURES["NoteFacets"][0],
+        {"facet": "tag", "author_id": None, "limit": 50},
+        "ix_note_facets_top",
+    ),
+    PlanCheck(
+        "tokens(access_token)",
+        "SELECT id FROM tokens WHERE access_token = :token",
+        {"token": "token"},
+        "ix_tokens_access_token",
+    ),
+]
+
+
+def _mysql_plan(connection: Connection, check: PlanCheck) -> tuple[set, bool]:
+    rows = connection.execute(text(f"EXPLAIN {check.query}"), check.params).mappings()
+    indexes, sorts = set(), False
+    for row in rows:
+        if row["key"]:
+            indexes.add(row["key"])
+        sorts = sorts or "filesort" in (row["Extra"] or "")
+    return indexes, sorts
+
+
+def _sqlite_plan(connection: Connection, check: PlanCheck) -> tuple[set, bool]:
+    rows = connection.execute(text(f"EXPLAIN QUERY PLAN {check.query}"), check.params)
+    indexes, sorts = set(), False
+    for row in rows:
+        detail = row[-1]
+        if "PRIMARY KEY" in detail:
+            indexes.add("PRIMARY")
+        if " INDEX " in detail:
+            indexes.add(detail.split(" INDEX ")[1].split()[0])
+        sorts = sorts or "TEMP B-TREE FOR ORDER BY" in detail
+    return indexes, sorts
+
+
+def check_plans(connection: Connection) -> list[str]:
+    explain = _sqlite_plan if connection.dialect.name == "sqlite" else _mysql_plan
+    failures = []
+    for check in PLAN_CHECKS:
+        indexes, sorts = explain(connection, check)
+        if check.index is not None and check.index not in indexes:
+            used = ", ".join(sorted(indexes)) or "no index"
+            failures.append(f"{check.procedure}: expected {check.index}, plan uses {used}")
+        if sorts:
+            failures.append(f"{check.procedure}: plan sorts rows instead of using an index")
+    return failures
@@ -0,0 +1,79 @@
+# Tables behind models/ (users, notes, tokens)
+
+UP = {
+    "mysql": [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            email VARCHAR(255) NOT NULL,
+            password VARCHAR(255) NOT NULL,
+            UNIQUE KEY ix_users_email (email)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS notes (
+            note_id INT AUTO_INCREMENT PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            description TEXT,
+            tag VARCHAR(100),
+            note_subject VARCHAR(255),
+            timestamp DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+            author_id INT,
+            CONSTRAINT fk_notes_author_id FOREIGN KEY (author_id) REFERENCES users (user_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS tokens (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            access_token VARCHAR(512) NOT NULL,
+            token_type VARCHAR(50) NOT NULL,
+            user_id INT,
+            CONSTRAINT fk_tokens_user_id FOREIGN KEY (user_id) REFERENCES users (user_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+    ],
+    "sqlite": [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(255) NOT NULL,
+            email VARCHAR(255) NOT NULL,
+            password VARCHAR(255) NOT NULL
+        )
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)",
+        """
+        CREATE TABLE IF NOT EXISTS notes (
+            note_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title VARCHAR(255) NOT NULL,
+            description TEXT,
+            tag VARCHAR(100),
+            note_subject VARCHAR(255),
+            timestamp DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
+            author_id INTEGER REFERENCES users (user_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS tokens (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            access_token VARCHAR(512) NOT NULL,
+            token_type VARCHAR(50) NOT NULL,
+            user_id INTEGER REFERENCES users (user_id)
+        )
+        """,
+    ],
+}
+
+DOWN = {
+    "mysql": [
+        "DROP TABLE IF EXISTS tokens",
+        "DROP TABLE IF EXISTS notes",
+        "DROP TABLE IF EXISTS users",
+    ],
+    "sqlite": [
+        "DROP TABLE IF EXISTS tokens",
+        "DROP TABLE IF EXISTS notes",
+        "DROP TABLE IF EXISTS users",
+    ],
+}
@@ -0,0 +1,146 @@
+# Stored procedures called by services/ and repositories/. The SQLite
+# stand-in implements the same procedures in repositories/sqlite.py.
+
+from repositories.note import NOTE_COLUMNS
+from repositories.sqlite import USER_COLUMNS
+
+PROCEDURES = {
+    "GetUserByEmail": f"""
+        CREATE PROCEDURE GetUserByEmail(IN p_email VARCHAR(255))
+        BEGIN
+            SELECT {USER_COLUMNS} FROM users WHERE email = p_email;
+        END
+    """,
+    "GetUserById": f"""
+        CREATE PROCEDURE GetUserById(IN p_user_id INT)
+        BEGIN
+            SELECT {USER_COLUMNS} FROM users WHERE user_id = p_user_id;
+        END
+    """,
+    "GetAllUsers": f"""
+        CREATE PROCEDURE GetAllUsers()
+        BEGIN
+            SELECT {USER_COLUMNS} FROM users ORDER BY user_id;
+        END
+    """,
+    "CreateUser": f"""
+        CREATE PROCEDURE CreateUser(
+            IN p_name VARCHAR(255), IN p_email VARCHAR(255), IN p_password VARCHAR(255)
+        )
+        BEGIN
+            INSERT INTO users (name, email, password) VALUES (p_name, p_email, p_password);
+            SELECT {USER_COLUMNS} FROM users WHERE user_id = LAST_INSERT_ID();
+        END
+    """,
+    "UpdateUser": f"""
+        CREATE PROCEDURE UpdateUser(
+            IN p_user_id INT, IN p_name VARCHAR(255), IN p_email VARCHAR(255),
+            IN p_password VARCHAR(255)
+        )
+        BEGIN
+            UPDATE users
+            SET name = COALESCE(p_name, name),
+                email = COALESCE(p_email, email),
+                password = COALESCE(p_password, password)
+            WHERE user_id = p_user_id;
+            SELECT {USER_COLUMNS} FROM users WHERE user_id = p_user_id;
+        END
+    """,
+    "DeleteUser": """
+        CREATE PROCEDURE DeleteUser(IN p_user_id INT)
+        BEGIN
+            DELETE FROM tokens WHERE user_id = p_user_id;
+            DELETE FROM notes WHERE author_id = p_user_id;
+            DELETE FROM users WHERE user_id = p_user_id;
+        END
+    """,
+    "FindAllNotes": f"""
+        CREATE PROCEDURE FindAllNotes(IN p_offset INT, IN p_limit INT)
+        BEGIN
+            SELECT {NOTE_COLUMNS} FROM notes
+            ORDER BY timestamp DESC, note_id DESC
+            LIMIT p_offset, p_limit;
+        END
+    """,
+    "FindNotesAfter": f"""
+        CREATE PROCEDURE FindNotesAfter(
+            IN p_cursor_ts DATETIME(6), IN p_cursor_id INT, IN p_limit INT
+        )
+        BEGIN
+            SELECT {NOTE_COLUMNS} FROM notes
+            WHERE (timestamp, note_id) < (p_cursor_ts, p_cursor_id)
+            ORDER BY timestamp DESC, note_id DESC
+            LIMIT p_limit;
+        END
+    """,
+    "CountAllNotes": """
+        CREATE PROCEDURE CountAllNotes()
+        BEGIN
+            SELECT COUNT(*) FROM notes;
+        END
+    """,
+    "ApproxCountNotes": """
+        CREATE PROCEDURE ApproxCountNotes()
+        BEGIN
+            SELECT TABLE_ROWS FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'notes';
+        END
+    """,
+    "FindOneNote": f"""
+        CREATE PROCEDURE FindOneNote(IN p_note_id INT)
+        BEGIN
+            SELECT {NOTE_COLUMNS} FROM notes WHERE note_id = p_note_id;
+        END
+    """,
+    "GetNoteById": f"""
+        CREATE PROCEDURE GetNoteById(IN p_note_id INT)
+        BEGIN
+            SELECT {NOTE_COLUMNS} FROM notes WHERE note_id = p_note_id;
+        END
+    """,
+    "CreateNote": f"""
+        CREATE PROCEDURE CreateNote(
+            IN p_title VARCHAR(255), IN p_description TEXT, IN p_tag VARCHAR(100),
+            IN p_note_subject VARCHAR(255), IN p_author_id INT
+        )
+        BEGIN
+            INSERT INTO notes (title, description, tag, note_subject, timestamp, author_id)
+            VALUES (p_title, p_description, p_tag, p_note_subject, UTC_TIMESTAMP(6), p_author_id);
+            SELECT {NOTE_COLUMNS} FROM notes WHERE note_id = LAST_INSERT_ID();
+        END
+    """,
+    "UpdateNote": f"""
+        CREATE PROCEDURE UpdateNote(
+            IN p_note_id INT, IN p_title VARCHAR(255), IN p_description TEXT,
+            IN p_tag VARCHAR(100), IN p_note_subject VARCHAR(255), IN p_author_id INT
+        )
+        BEGIN
+            UPDATE notes
+            SET title = COALESCE(p_title, title),
+                description = COALESCE(p_description, description),
+                tag = COALESCE(p_tag, tag),
+                note_subject = COALESCE(p_note_subject, note_subject)
+            WHERE note_id = p_note_id AND author_id = p_author_id;
+            SELECT {NOTE_COLUMNS} FROM notes
+            WHERE note_id = p_note_id AND author_id = p_author_id;
+        END
+    """,
+    "DeleteNote": """
+        CREATE PROCEDURE DeleteNote(IN p_note_id INT, IN p_author_id INT)
+        BEGIN
+            DELETE FROM notes WHERE note_id = p_note_id AND author_id = p_author_id;
+        END
+    """,
+}
+
+UP = {
+    "mysql": [
+        statement
+        for name, body in PROCEDURES.items()
+        for statement in (f"DROP PROCEDURE IF EXISTS {name}", body)
+    ],
+}
+
+DOWN = {
+    "mysql": [f"DROP PROCEDURE IF EXISTS {name}" for name in PROCEDURES],
+}
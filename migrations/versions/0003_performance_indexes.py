@@ -0,0 +1,45 @@
+# Indexes for the hot paths, see migrations/explain.py for what uses them
+
+INDEXES = {
+    "ix_notes_timestamp_note_id": "notes (timestamp, note_id)",
+    "ix_notes_author_id_timestamp": "notes (author_id, timestamp)",
+    "ix_notes_tag": "notes (tag)",
+    "ix_tokens_access_token": "tokens (access_token)",
+    "ix_tokens_user_id": "tokens (user_id)",
+}
+
+# Once the indexes above cover them, InnoDB drops the indexes it created for
+# the 0001 foreign keys, and then refuses to drop ours (error 1553). DOWN
+# drops these keys around the index drops and adds them back, which also
+# brings back their own indexes.
+FOREIGN_KEYS = {
+    "fk_notes_author_id": "notes (author_id)",
+    "fk_tokens_user_id": "tokens (user_id)",
+}
+
+UP = {
+    "mysql": [f"CREATE INDEX {name} ON {columns}" for name, columns in INDEXES.items()],
+    "sqlite": [
+        f"CREATE INDEX IF NOT EXISTS {name} ON {columns}"
+        for name, columns in INDEXES.items()
+    ],
+}
+
+DOWN = {
+    "mysql": [
+        *(
+            f"ALTER TABLE {columns.split()[0]} DROP FOREIGN KEY {name}"
+            for name, columns in FOREIGN_KEYS.items()
+        ),
+        *(
+            f"DROP INDEX {name} ON {columns.split()[0]}"
+            for name, columns in INDEXES.items()
+        ),
+        *(
+            f"ALTER TABLE {columns.split()[0]} ADD CONSTRAINT {name} "
+            f"FOREIGN KEY {columns.split(maxsplit=1)[1]} REFERENCES users (user_id)"
+            for name, columns in FOREIGN_KEYS.items()
+        ),
+    ],
+    "sqlite": [f"DROP INDEX IF EXISTS {name}" for name in INDEXES],
+}
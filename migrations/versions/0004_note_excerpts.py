@@ -0,0 +1,44 @@
+# Preview columns for summary listings: the first EXCERPT_LENGTH characters of
+# notes.description and its length in bytes. Generated columns, so the
+# database keeps them in step with every write. MySQL stores them in the row,
+# next to the other short columns, so list pages never touch the off-page
+# description.
+#
+# Offline on MySQL: adding STORED generated columns can only be done by
+# copying the table (no ALGORITHM=INPLACE), so UP asks for that explicitly
+# with LOCK=SHARED. Reads go on during the copy, but writes to notes wait
+# until it ends. Run it in a maintenance window, or apply the ALTER with an
+# online schema change tool (gh-ost, pt-online-schema-change) first.
+# Dropping the columns again is in place and keeps accepting writes.
+
+EXCERPT_LENGTH = 200
+
+UP = {
+    "mysql": [
+        f"""
+        ALTER TABLE notes
+            ADD COLUMN excerpt VARCHAR({EXCERPT_LENGTH})
+                AS (LEFT(description, {EXCERPT_LENGTH})) STORED,
+            ADD COLUMN description_length INT
+                AS (OCTET_LENGTH(description)) STORED,
+            ALGORITHM=COPY, LOCK=SHARED
+        """,
+    ],
+    "sqlite": [
+        "ALTER TABLE notes ADD COLUMN excerpt TEXT "
+        f"GENERATED ALWAYS AS (substr(description, 1, {EXCERPT_LENGTH})) VIRTUAL",
+        "ALTER TABLE notes ADD COLUMN description_length INTEGER "
+        "GENERATED ALWAYS AS (length(CAST(description AS BLOB))) VIRTUAL",
+    ],
+}
+
+DOWN = {
+    "mysql": [
+        "ALTER TABLE notes DROP COLUMN excerpt, DROP COLUMN description_length, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    ],
+    "sqlite": [
+        "ALTER TABLE notes DROP COLUMN description_length",
+        "ALTER TABLE notes DROP COLUMN excerpt",
+    ],
+}
@@ -0,0 +1,25 @@
+# Indexes for the find_all filters: equality on the leading column, then the
+# listing order (timestamp DESC, note_id DESC) straight from the index.
+# ix_notes_tag is a prefix of ix_notes_tag_timestamp and is dropped.
+
+INDEXES = {
+    "ix_notes_tag_timestamp": "notes (tag, timestamp, note_id)",
+    "ix_notes_note_subject_timestamp": "notes (note_subject, timestamp, note_id)",
+}
+
+UP = {
+    "mysql": [f"CREATE INDEX {name} ON {columns}" for name, columns in INDEXES.items()]
+    + ["DROP INDEX ix_notes_tag ON notes"],
+    "sqlite": [
+        f"CREATE INDEX IF NOT EXISTS {name} ON {columns}"
+        for name, columns in INDEXES.items()
+    ]
+    + ["DROP INDEX IF EXISTS ix_notes_tag"],
+}
+
+DOWN = {
+    "mysql": ["CREATE INDEX ix_notes_tag ON notes (tag)"]
+    + [f"DROP INDEX {name} ON notes" for name in INDEXES],
+    "sqlite": ["CREATE INDEX IF NOT EXISTS ix_notes_tag ON notes (tag)"]
+    + [f"DROP INDEX IF EXISTS {name}" for name in INDEXES],
+}
@@ -0,0 +1,30 @@
+# Author-scoped listing (/notes/mine): equality on author_id, then the listing
+# order and the keyset seek on (timestamp, note_id), all from one index.
+# It replaces ix_notes_author_id_timestamp, its prefix, which also served
+# the author_id foreign key; the new index is created first so the key
+# always has one.
+
+UP = {
+    "mysql": [
+        "CREATE INDEX ix_notes_author_id_timestamp_note_id "
+        "ON notes (author_id, timestamp, note_id)",
+        "DROP INDEX ix_notes_author_id_timestamp ON notes",
+    ],
+    "sqlite": [
+        "CREATE INDEX IF NOT EXISTS ix_notes_author_id_timestamp_note_id "
+        "ON notes (author_id, timestamp, note_id)",
+        "DROP INDEX IF EXISTS ix_notes_author_id_timestamp",
+    ],
+}
+
+DOWN = {
+    "mysql": [
+        "CREATE INDEX ix_notes_author_id_timestamp ON notes (author_id, timestamp)",
+        "DROP INDEX ix_notes_author_id_timestamp_note_id ON notes",
+    ],
+    "sqlite": [
+        "CREATE INDEX IF NOT EXISTS ix_notes_author_id_timestamp "
+        "ON notes (author_id, timestamp)",
+        "DROP INDEX IF EXISTS ix_notes_author_id_timestamp_note_id",
+    ],
+}
@@ -0,0 +1,55 @@
+# Full-text search over notes (services/note.py search_notes). MySQL ranks
+# matches with a FULLTEXT index in natural language mode; the SQLite stand-in
+# has no FULLTEXT and searches an in-process inverted index instead
+# (utils/search.py), so it needs no schema change.
+#
+# Offline on MySQL: ftx_notes_text is the first FULLTEXT index on notes, and
+# notes has no FTS_DOC_ID column of its own, so InnoDB rebuilds the table to
+# add a hidden one. The build runs in place but cannot accept concurrent
+# writes, so UP asks for LOCK=SHARED explicitly. Reads go on during the
+# build, but writes to notes wait until it ends. Run it in a maintenance
+# window. Dropping the index again is in place and keeps accepting writes.
+
+from repositories.note import NOTE_COLUMNS, SEARCH_COLUMNS
+
+MATCH = f"MATCH({SEARCH_COLUMNS}) AGAINST (p_query IN NATURAL LANGUAGE MODE)"
+
+PROCEDURES = {
+    "SearchNotes": f"""
+        CREATE PROCEDURE SearchNotes(
+            IN p_query VARCHAR(255), IN p_offset INT, IN p_limit INT
+        )
+        BEGIN
+            SELECT {NOTE_COLUMNS}, {MATCH} AS score FROM notes
+            WHERE {MATCH}
+            ORDER BY score DESC, note_id DESC
+            LIMIT p_offset, p_limit;
+        END
+    """,
+    "CountSearchNotes": f"""
+        CREATE PROCEDURE CountSearchNotes(IN p_query VARCHAR(255))
+        BEGIN
+            SELECT COUNT(*) FROM notes WHERE {MATCH};
+        END
+    """,
+}
+
+UP = {
+    "mysql": [
+        f"ALTER TABLE notes ADD FULLTEXT INDEX ftx_notes_text ({SEARCH_COLUMNS}), "
+        "ALGORITHM=INPLACE, LOCK=SHARED"
+    ]
+    + [
+        statement
+        for name, body in PROCEDURES.items()
+        for statement in (f"DROP PROCEDURE IF EXISTS {name}", body)
+    ],
+}
+
+DOWN = {
+    "mysql": [f"DROP PROCEDURE IF EXISTS {name}" for name in PROCEDURES]
+    + [
+        "ALTER TABLE notes DROP INDEX ftx_notes_text, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    ],
+}
@@ -0,0 +1,245 @@
+# Note counts for each tag and note_subject value, kept up to date by
+# triggers on notes so facet reads never scan notes. Every note counts twice
+# per facet: under its author (author_id 0 for notes without one) and under
+# ALL_AUTHORS, so the unfiltered counts are read directly instead of summed
+# over authors. Rows whose count drops to zero are removed. Values are
+# compared byte for byte (utf8mb4_bin on MySQL, SQLite's default BINARY), so
+# "Python" and "python" are separate rows on both, as in the autocomplete
+# index.
+#
+# The triggers are created before the backfill. On MySQL the backfill runs
+# under LOCK TABLES and replaces whatever the triggers counted meanwhile, so
+# no write made during the migration is lost or counted twice; writes to
+# notes wait for the backfill. SQLite runs the whole migration as one write
+# transaction.
+#
+# UpdateNote and DeleteNote are redefined to also return the tag and
+# note_subject the write replaced, read under the row lock, so the services
+# apply the write to the autocomplete index (utils/autocomplete.py) without
+# another query. DOWN restores the 0002 versions.
+
+from importlib import import_module
+from repositories.note import ALL_AUTHORS, FACET_FIELDS as FACETS, NOTE_COLUMNS
+
+STORED_PROCEDURES = import_module("migrations.versions.0002_stored_procedures")
+
+
+# collate groups the values byte for byte like the note_facets key; the
+# notes columns keep their case-insensitive collation on MySQL
+def _backfill(facet: str, collate: str) -> list[str]:
+    value = facet + collate
+    return [
+        "INSERT INTO note_facets (facet, value, author_id, note_count) "
+        f"SELECT '{facet}', {value}, {author}, COUNT(*) FROM notes "
+        f"WHERE {facet} IS NOT NULL GROUP BY {group}"
+        for author, group in (
+            ("COALESCE(author_id, 0)", f"{value}, COALESCE(author_id, 0)"),
+            (str(ALL_AUTHORS), value),
+        )
+    ]
+
+
+def _backfill_all(collate: str = "") -> list[str]:
+    return [
+        "DELETE FROM note_facets",
+        *(statement for facet in FACETS for statement in _backfill(facet, collate)),
+    ]
+
+
+def _authors(row: str) -> tuple[str, ...]:
+    return (f"COALESCE({row}.author_id, 0)", str(ALL_AUTHORS))
+
+
+def _mysql_add(row: str) -> str:
+    return "\n".join(
+        f"""
+            IF {row}.{facet} IS NOT NULL THEN
+                INSERT INTO note_facets (facet, value, author_id, note_count)
+                VALUES ('{facet}', {row}.{facet}, {author}, 1)
+                ON DUPLICATE KEY UPDATE note_count = note_count + 1;
+            END IF;"""
+        for facet in FACETS
+        for author in _authors(row)
+    )
+
+
+def _mysql_remove(row: str) -> str:
+    conditions = " OR ".join(
+        f"(facet = '{facet}' AND value = {row}.{facet})" for facet in FACETS
+    )
+    authors = ", ".join(_authors(row))
+    return f"""
+            UPDATE note_facets SET note_count = note_count - 1
+            WHERE ({conditions}) AND author_id IN ({authors});
+            DELETE FROM note_facets
+            WHERE ({conditions}) AND author_id IN ({authors}) AND note_count <= 0;"""
+
+
+def _sqlite_add(row: str) -> str:
+    return "".join(
+        f"""
+            INSERT INTO note_facets (facet, value, author_id, note_count)
+            SELECT '{facet}', {row}.{facet}, {author}, 1
+            WHERE {row}.{facet} IS NOT NULL
+            ON CONFLICT (facet, value, author_id)
+            DO UPDATE SET note_count = note_count + 1;"""
+        for facet in FACETS
+        for author in _authors(row)
+    )
+
+
+def _sqlite_remove(row: str) -> str:
+    # Same statements as MySQL, both dialects accept them
+    return _mysql_remove(row)
+
+
+# Most used values of a facet, over all authors or for one author. Served in
+# order from ix_note_facets_top, no grouping or sort.
+PROCEDURES = {
+    "NoteFacets": f"""
+        CREATE PROCEDURE NoteFacets(
+            IN p_facet VARCHAR(20), IN p_author_id INT, IN p_limit INT
+        )
+        BEGIN
+            SELECT value, note_count FROM note_facets
+            WHERE facet = p_facet AND author_id = COALESCE(p_author_id, {ALL_AUTHORS})
+            ORDER BY note_count DESC, value
+            LIMIT p_limit;
+        END
+    """,
+    # Both return the replaced tag and note_subject, see the header
+    "UpdateNote": f"""
+        CREATE PROCEDURE UpdateNote(
+            IN p_note_id INT, IN p_title VARCHAR(255), IN p_description TEXT,
+            IN p_tag VARCHAR(100), IN p_note_subject VARCHAR(255), IN p_author_id INT
+        )
+        BEGIN
+            DECLARE v_tag VARCHAR(100);
+            DECLARE v_note_subject VARCHAR(255);
+            SELECT tag, note_subject INTO v_tag, v_note_subject FROM notes
+            WHERE note_id = p_note_id AND author_id = p_author_id
+            FOR UPDATE;
+            UPDATE notes
+            SET title = COALESCE(p_title, title),
+                description = COALESCE(p_description, description),
+                tag = COALESCE(p_tag, tag),
+                note_subject = COALESCE(p_note_subject, note_subject)
+            WHERE note_id = p_note_id AND author_id = p_author_id;
+            SELECT {NOTE_COLUMNS}, v_tag, v_note_subject FROM notes
+            WHERE note_id = p_note_id AND author_id = p_author_id;
+        END
+    """,
+    "DeleteNote": """
+        CREATE PROCEDURE DeleteNote(IN p_note_id INT, IN p_author_id INT)
+        BEGIN
+            DECLARE v_tag VARCHAR(100);
+            DECLARE v_note_subject VARCHAR(255);
+            DECLARE v_deleted INT;
+            SELECT tag, note_subject INTO v_tag, v_note_subject FROM notes
+            WHERE note_id = p_note_id AND author_id = p_author_id
+            FOR UPDATE;
+            DELETE FROM notes WHERE note_id = p_note_id AND author_id = p_author_id;
+            SET v_deleted = ROW_COUNT();
+            SELECT v_tag, v_note_subject FROM DUAL WHERE v_deleted > 0;
+        END
+    """,
+}
+
+UNCHANGED = " AND ".join(
+    f"OLD.{column} <=> NEW.{column}" for column in FACETS + ("author_id",)
+)
+SQLITE_CHANGED = " OR ".join(
+    f"OLD.{column} IS NOT NEW.{column}" for column in FACETS + ("author_id",)
+)
+
+TOP_INDEX = (
+    "CREATE INDEX ix_note_facets_top "
+    "ON note_facets (facet, author_id, note_count DESC, value)"
+)
+
+UP = {
+    "mysql": [
+        """
+        CREATE TABLE IF NOT EXISTS note_facets (
+            facet VARCHAR(20) NOT NULL,
+            value VARCHAR(255) COLLATE utf8mb4_bin NOT NULL,
+            author_id INT NOT NULL,
+            note_count INT NOT NULL,
+            PRIMARY KEY (facet, value, author_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        TOP_INDEX,
+        f"""
+        CREATE TRIGGER notes_facets_insert AFTER INSERT ON notes FOR EACH ROW
+        BEGIN{_mysql_add("NEW")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER notes_facets_update AFTER UPDATE ON notes FOR EACH ROW
+        BEGIN
+            IF NOT ({UNCHANGED}) THEN{_mysql_remove("OLD")}{_mysql_add("NEW")}
+            END IF;
+        END
+        """,
+        f"""
+        CREATE TRIGGER notes_facets_delete AFTER DELETE ON notes FOR EACH ROW
+        BEGIN{_mysql_remove("OLD")}
+        END
+        """,
+        "LOCK TABLES notes READ, note_facets WRITE",
+        *_backfill_all(" COLLATE utf8mb4_bin"),
+        "UNLOCK TABLES",
+        *(
+            statement
+            for name, body in PROCEDURES.items()
+            for statement in (f"DROP PROCEDURE IF EXISTS {name}", body)
+        ),
+    ],
+    "sqlite": [
+        """
+        CREATE TABLE IF NOT EXISTS note_facets (
+            facet VARCHAR(20) NOT NULL,
+            value VARCHAR(255) NOT NULL,
+            author_id INTEGER NOT NULL,
+            note_count INTEGER NOT NULL,
+            PRIMARY KEY (facet, value, author_id)
+        ) WITHOUT ROWID
+        """,
+        TOP_INDEX,
+        f"""
+        CREATE TRIGGER notes_facets_insert AFTER INSERT ON notes
+        BEGIN{_sqlite_add("NEW")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER notes_facets_update AFTER UPDATE ON notes
+        WHEN {SQLITE_CHANGED}
+        BEGIN{_sqlite_remove("OLD")}{_sqlite_add("NEW")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER notes_facets_delete AFTER DELETE ON notes
+        BEGIN{_sqlite_remove("OLD")}
+        END
+        """,
+        *_backfill_all(),
+    ],
+}
+
+DROP_TRIGGERS_AND_TABLE = [
+    "DROP TRIGGER IF EXISTS notes_facets_insert",
+    "DROP TRIGGER IF EXISTS notes_facets_update",
+    "DROP TRIGGER IF EXISTS notes_facets_delete",
+    "DROP TABLE IF EXISTS note_facets",
+]
+
+DOWN = {
+    "mysql": [f"DROP PROCEDURE IF EXISTS {name}" for name in PROCEDURES]
+    + [
+        STORED_PROCEDURES.PROCEDURES[name]
+        for name in PROCEDURES
+        if name in STORED_PROCEDURES.PROCEDURES
+    ]
+    + DROP_TRIGGERS_AND_TABLE,
+    "sqlite": DROP_TRIGGERS_AND_TABLE,
+}
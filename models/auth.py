@@ -7,8 +7,8 @@ class Token(Base):
     __tablename__ = "tokens"
 
     id = Column(Integer, primary_key=True, index=True)
-    access_token = Column(String, index=True, nullable=False)
-    token_type = Column(String, nullable=False)
-    user_id = Column(Integer, ForeignKey("users.user_id"))
+    access_token = Column(String(512), index=True, nullable=False)
+    token_type = Column(String(50), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.user_id"), index=True)
 
     user = relationship("User", back_populates="tokens")
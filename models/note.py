@@ -1,18 +1,54 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Computed, Integer, String, Text, ForeignKey, DateTime, Index, desc
 from sqlalchemy.orm import relationship
 from config.db import Base
 
 
 class Note(Base):
     __tablename__ = "notes"
+    # Kept in sync with migrations/versions
+    __table_args__ = (
+        Index("ix_notes_timestamp_note_id", "timestamp", "note_id"),
+        Index(
+            "ix_notes_author_id_timestamp_note_id", "author_id", "timestamp", "note_id"
+        ),
+        Index("ix_notes_tag_timestamp", "tag", "timestamp", "note_id"),
+        Index(
+            "ix_notes_note_subject_timestamp", "note_subject", "timestamp", "note_id"
+        ),
+    )
 
     note_id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text)
     tag = Column(String(100))
     note_subject = Column(String(255))
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
     author_id = Column(Integer, ForeignKey("users.user_id"))
+    # Generated from description, see migrations/versions/0004_note_excerpts.py
+    excerpt = Column(String(200), Computed("LEFT(description, 200)", persisted=True))
+    description_length = Column(
+        Integer, Computed("OCTET_LENGTH(description)", persisted=True)
+    )
 
     author = relationship("User", back_populates="notes")
+
+
+# Note counts per (facet, value, author), maintained by triggers on notes,
+# see migrations/versions/0008_note_facets.py
+class NoteFacet(Base):
+    __tablename__ = "note_facets"
+    # Kept in sync with migrations/versions
+    __table_args__ = (
+        Index(
+            "ix_note_facets_top", "facet", "author_id", desc("note_count"), "value"
+        ),
+    )
+
+    facet = Column(String(20), primary_key=True)
+    value = Column(
+        String(255).with_variant(String(255, collation="utf8mb4_bin"), "mysql"),
+        primary_key=True,
+    )
+    author_id = Column(Integer, primary_key=True)
+    note_count = Column(Integer, nullable=False)
@@ -0,0 +1,153 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Sequence, TypedDict
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.sql.elements import TextClause
+from models.note import Note
+
+
+class NoteRow(TypedDict):
+    note_id: int
+    title: str
+    description: str
+    tag: Optional[str]
+    note_subject: Optional[str]
+    timestamp: datetime
+    author_id: int
+
+
+notes_table = Note.__table__
+
+# Column order of every note row returned by the procedures (FindAllNotes,
+# FindOneNote, CreateNote, UpdateNote, ...)
+NOTE_FIELDS = tuple(NoteRow.__annotations__)
+
+# The same as a SELECT list, shared by repositories/sqlite.py, the procedures
+# in migrations/ and the plan checks so they cannot drift apart
+NOTE_COLUMNS = ", ".join(NOTE_FIELDS)
+
+
+# Columns covered by full-text search
+SEARCH_FIELDS = ("title", "description", "tag", "note_subject")
+SEARCH_COLUMNS = ", ".join(SEARCH_FIELDS)
+
+# Full rows for a page of search hits (the SQLite stand-in ranks in process)
+notes_by_ids_query = text(
+    f"SELECT {NOTE_COLUMNS} FROM notes WHERE note_id IN :note_ids"
+).bindparams(bindparam("note_ids", expanding=True))
+
+search_documents_query = text(
+    f"SELECT note_id, {SEARCH_COLUMNS} FROM notes"
+)
+
+
+# Columns counted in note_facets. Each note is counted under its author and
+# under ALL_AUTHORS, see migrations/versions/0008_note_facets.py
+FACET_FIELDS = ("tag", "note_subject")
+FACET_COLUMNS = ", ".join(FACET_FIELDS)
+ALL_AUTHORS = -1
+
+# Every facet value with its note count, loaded by the autocomplete index
+facet_values_query = text(
+    f"SELECT facet, value, note_count FROM note_facets WHERE author_id = {ALL_AUTHORS}"
+)
+
+# Row tuple -> dict ready for NoteInDB, validated once by the route's response_model
+def note_from_row(row: Sequence) -> NoteRow:
+    return dict(zip(NOTE_FIELDS, row))  # type: ignore
+
+
+# UpdateNote and DeleteNote end their row with the facet values the write
+# replaced (migrations/versions/0008_note_facets.py)
+def replaced_facets_from_row(row: Sequence) -> dict:
+    return dict(zip(FACET_FIELDS, row[-len(FACET_FIELDS):]))
+
+
+# note_id and timestamp are always read, they identify a row and its keyset cursor
+KEY_FIELDS = ("note_id", "timestamp")
+
+# Generated preview columns (migration 0004) that stand in for description
+SUMMARY_FIELDS = ("excerpt", "description_length")
+
+
+def projected_fields(fields: Sequence[str]) -> tuple[str, ...]:
+    unknown = set(fields).difference(NOTE_FIELDS + SUMMARY_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown note fields: {', '.join(sorted(unknown))}")
+    return tuple(
+        field
+        for field in NOTE_FIELDS + SUMMARY_FIELDS
+        if field in fields or field in KEY_FIELDS
+    )
+
+
+def summary_fields(fields: Optional[Sequence[str]]) -> tuple[str, ...]:
+    # The selected fields (all by default) with description swapped for its preview
+    selected = fields or NOTE_FIELDS
+    return tuple(field for field in selected if field != "description") + SUMMARY_FIELDS
+
+
+def project_note(note: NoteRow, fields: Sequence[str]) -> dict:
+    return {field: note[field] for field in projected_fields(fields)}
+
+
+# FindOneNote, FindAllNotes and FindNotesAfter reading only the requested
+# columns, so an unselected description is neither read nor sent. Plain
+# SELECTs run unchanged on MySQL and SQLite and are routed to replicas.
+@lru_cache(maxsize=256)
+def projected_note_query(fields: tuple[str, ...]) -> TextClause:
+    columns = ", ".join(projected_fields(fields))
+    return text(f"SELECT {columns} FROM notes WHERE note_id = :note_id")
+
+
+# find_all filters, each bound as a parameter of the same name. The equality
+# filters are served by an index leading with the column and ordered by
+# (timestamp, note_id), see migrations/versions/0005_note_filter_indexes.py.
+FILTER_CONDITIONS = {
+    "tag": "tag = :tag",
+    "note_subject": "note_subject = :note_subject",
+    "author_id": "author_id = :author_id",
+    "since": "timestamp >= :since",
+    "until": "timestamp < :until",
+}
+
+
+def _where(conditions: Sequence[str]) -> str:
+    return f"WHERE {' AND '.join(conditions)} " if conditions else ""
+
+
+@lru_cache(maxsize=256)
+def projected_page_query(
+    fields: tuple[str, ...], after_cursor: bool, filters: tuple[str, ...] = ()
+) -> TextClause:
+    columns = ", ".join(projected_fields(fields))
+    conditions = [FILTER_CONDITIONS[name] for name in filters]
+    if after_cursor:
+        conditions.append("(timestamp, note_id) < (:cursor_ts, :cursor_id)")
+    return text(
+        f"SELECT {columns} FROM notes {_where(conditions)}"
+        "ORDER BY timestamp DESC, note_id DESC LIMIT :limit OFFSET :offset"
+    )
+
+
+@lru_cache(maxsize=64)
+def filtered_count_query(filters: tuple[str, ...]) -> TextClause:
+    conditions = [FILTER_CONDITIONS[name] for name in filters]
+    return text(f"SELECT COUNT(*) FROM notes {_where(conditions)}".rstrip())
+
+
+def select_notes(
+    author_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    # Oldest first on (timestamp, note_id), served by ix_notes_timestamp_note_id
+    # or, with an author, ix_notes_author_id_timestamp_note_id
+    query = select(*(notes_table.c[field] for field in NOTE_FIELDS))
+    if author_id is not None:
+        query = query.where(notes_table.c.author_id == author_id)
+    if since is not None:
+        query = query.where(notes_table.c.timestamp >= since)
+    if until is not None:
+        query = query.where(notes_table.c.timestamp < until)
+    return query.order_by(notes_table.c.timestamp, notes_table.c.note_id)
@@ -0,0 +1,100 @@
+from functools import lru_cache
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+from config.db import CALL_PATTERN
+from repositories.note import ALL_AUTHORS, FACET_COLUMNS, FACET_FIELDS, NOTE_COLUMNS
+
+# SQLite has no stored procedures, so every procedure the services CALL is
+# mapped here to the equivalent SQL. Column order matches the MySQL result
+# sets because several services read rows positionally.
+USER_COLUMNS = "user_id, name, email, password"
+NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+PROCEDURES = {
+    "GetUserByEmail": (
+        f"SELECT {USER_COLUMNS} FROM users WHERE email = :email",
+    ),
+    "GetUserById": (
+        f"SELECT {USER_COLUMNS} FROM users WHERE user_id = :userId",
+    ),
+    "GetAllUsers": (
+        f"SELECT {USER_COLUMNS} FROM users ORDER BY user_id",
+    ),
+    "CreateUser": (
+        "INSERT INTO users (name, email, password) VALUES (:name, :email, :password) "
+        f"RETURNING {USER_COLUMNS}",
+    ),
+    "UpdateUser": (
+        "UPDATE users SET name = COALESCE(:name, name), "
+        "email = COALESCE(:email, email), password = COALESCE(:password, password) "
+        f"WHERE user_id = :userId RETURNING {USER_COLUMNS}",
+    ),
+    "DeleteUser": (
+        "DELETE FROM tokens WHERE user_id = :userId",
+        "DELETE FROM notes WHERE author_id = :userId",
+        "DELETE FROM users WHERE user_id = :userId",
+    ),
+    "FindAllNotes": (
+        f"SELECT {NOTE_COLUMNS} FROM notes ORDER BY timestamp DESC, note_id DESC "
+        "LIMIT :limit OFFSET :offset",
+    ),
+    "FindNotesAfter": (
+        f"SELECT {NOTE_COLUMNS} FROM notes "
+        "WHERE (timestamp, note_id) < (:cursor_ts, :cursor_id) "
+        "ORDER BY timestamp DESC, note_id DESC LIMIT :limit",
+    ),
+    "CountAllNotes": (
+        "SELECT COUNT(*) FROM notes",
+    ),
+    # Highest rowid, an O(1) estimate that ignores deleted rows
+    "ApproxCountNotes": (
+        "SELECT COALESCE(MAX(note_id), 0) FROM notes",
+    ),
+    "NoteFacets": (
+        "SELECT value, note_count FROM note_facets "
+        f"WHERE facet = :facet AND author_id = COALESCE(:author_id, {ALL_AUTHORS}) "
+        "ORDER BY note_count DESC, value LIMIT :limit",
+    ),
+    "FindOneNote": (
+        f"SELECT {NOTE_COLUMNS} FROM notes WHERE note_id = :note_id",
+    ),
+    "GetNoteById": (
+        f"SELECT {NOTE_COLUMNS} FROM notes WHERE note_id = :note_id",
+    ),
+    "CreateNote": (
+        "INSERT INTO notes (title, description, tag, note_subject, timestamp, author_id) "
+        f"VALUES (:title, :description, :tag, :note_subject, {NOW}, :author_id) "
+        f"RETURNING {NOTE_COLUMNS}",
+    ),
+    # RETURNING only sees the new row, so the replaced facet values are kept
+    # in a temp table, as the MySQL procedure keeps them in variables
+    "UpdateNote": (
+        f"CREATE TEMP TABLE IF NOT EXISTS replaced_facets ({FACET_COLUMNS})",
+        "DELETE FROM temp.replaced_facets",
+        f"INSERT INTO temp.replaced_facets SELECT {FACET_COLUMNS} FROM notes "
+        "WHERE note_id = :note_id AND author_id = :author_id",
+        "UPDATE notes SET title = COALESCE(:title, title), "
+        "description = COALESCE(:description, description), "
+        "tag = COALESCE(:tag, tag), note_subject = COALESCE(:note_subject, note_subject) "
+        f"WHERE note_id = :note_id AND author_id = :author_id RETURNING {NOTE_COLUMNS}, "
+        + ", ".join(
+            f"(SELECT {field} FROM temp.replaced_facets)" for field in FACET_FIELDS
+        ),
+    ),
+    "DeleteNote": (
+        "DELETE FROM notes WHERE note_id = :note_id AND author_id = :author_id "
+        f"RETURNING {FACET_COLUMNS}",
+    ),
+}
+
+@lru_cache(maxsize=None)
+def translate_call(sql: str) -> Optional[tuple[TextClause, ...]]:
+    match = CALL_PATTERN.match(sql)
+    if match is None:
+        return None
+    name = match.group(1)
+    if name not in PROCEDURES:
+        raise NotImplementedError(f"No SQLite implementation for procedure {name}")
+    return tuple(text(statement) for statement in PROCEDURES[name])
+
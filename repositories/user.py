@@ -1,20 +1,17 @@
 from sqlalchemy import text
-from sqlalchemy.orm import Session
+from config.db import DBSession
 from schemas.user import UserCreate, UserUpdateRequest
 from utils.authentication import get_password_hash
+from utils.database import execute
 
 
-def get_user_by_email(db: Session, email: str):
+async def get_user_by_email(db: DBSession, email: str):
     return (
-        db.execute(text("CALL GetUserByEmail(:email)"), {"email": email})
-        .mappings()
-        .first()
-    )
+        await execute(db, text("CALL GetUserByEmail(:email)"), {"email": email})
+    ).mappings().first()
 
 
-def get_user_by_id(db: Session, user_id: int):
+async def get_user_by_id(db: DBSession, user_id: int):
     return (
-        db.execute(text("CALL GetUserById(:userId)"), {"userId": user_id})
-        .mappings()
-        .first()
-    )
+        await execute(db, text("CALL GetUserById(:userId)"), {"userId": user_id})
+    ).mappings().first()
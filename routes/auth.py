@@ -1,6 +1,5 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
 from config.constants import (
     ERROR_SIGNUP,
     ERROR_LOGIN,
@@ -13,9 +12,10 @@ from config.constants import (
 from config.settings import ACCESS_TOKEN_EXPIRE_MINUTES
 from schemas.auth import TokenData, LoginSchema, ResponseModel
 from schemas.user import User as UserSchema, UserCreate
-from utils.authentication import verify_password, get_password_hash, create_access_token
+from utils.authentication import verify_password_async, create_access_token
 from repositories.user import get_user_by_email
 from services.user import create_user
+from config.db import DBSession
 from utils.dependencies import get_db, get_current_user
 
 auth = APIRouter(
@@ -25,20 +25,18 @@ auth = APIRouter(
 
 
 @auth.post(f"{API_PREFIX}/signup", response_model=ResponseModel)
-async def signup(user: UserCreate, db: Session = Depends(get_db)) -> ResponseModel:
+async def signup(user: UserCreate, db: DBSession = Depends(get_db)) -> ResponseModel:
     try:
-        existing_user = get_user_by_email(db, user.email)
-        if existing_user:
+        new_user = await create_user(db, user)
+        if not new_user:
             return ResponseModel(status=False, detail="Email already registered")
-
-        hashed_password = get_password_hash(user.password)
-        create_user(db, user, hashed_password) # type: ignore
-        new_user = get_user_by_email(db, user.email)
         return ResponseModel(
             status=True,
             detail=SUCCESS_SIGNUP,
             data=dict(UserSchema(**dict(new_user))), # type: ignore
         )
+    except HTTPException as http_exc:
+        raise http_exc
     except Exception as e:
         return ResponseModel(
             status=False,
@@ -47,11 +45,13 @@ async def signup(user: UserCreate, db: Session = Depends(get_db)) -> ResponseMod
 
 
 @auth.post(f"{API_PREFIX}/login", response_model=ResponseModel)
-async def login(user: LoginSchema, db: Session = Depends(get_db)):
+async def login(user: LoginSchema, db: DBSession = Depends(get_db)):
     try:
-        db_user = get_user_by_email(db, user.email)
+        db_user = await get_user_by_email(db, user.email)
 
-        if not db_user or not verify_password(user.password, db_user.password):
+        if not db_user or not await verify_password_async(
+            user.password, db_user.password
+        ):
             return ResponseModel(
                 status=False,
                 detail=ERROR_LOGIN,
@@ -67,6 +67,8 @@ async def login(user: LoginSchema, db: Session = Depends(get_db)):
             detail=SUCCESS_LOGIN,
             data={"access_token": access_token, "token_type": "Bearer"},
         )
+    except HTTPException as http_exc:
+        raise http_exc
     except Exception as e:
         return ResponseModel(
             status=False,
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+from config.constants import SUCCESS_METRICS_FETCHED, API_PREFIX
+from config.db import pool_metrics
+from schemas.auth import TokenData, ResponseModel
+from services.note import note_counter
+from utils.autocomplete import facet_index
+from utils.cache import invalidation_bus, note_cache, notes_page_cache, principal_cache
+from utils.compression import compressed_body_cache
+from utils.dependencies import get_current_user
+from utils.hashing import hashing_executor
+from utils.search import search_index
+from utils.singleflight import read_flight
+
+metrics = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+)
+
+
+@metrics.get(f"{API_PREFIX}/stats", response_model=ResponseModel)
+async def stats_route(
+    current_user: TokenData = Depends(get_current_user),
+) -> ResponseModel:
+    return ResponseModel(
+        status=True,
+        detail=SUCCESS_METRICS_FETCHED,
+        data={
+            "hashing": hashing_executor.stats(),
+            "principal_cache": principal_cache.stats(),
+            "note_cache": note_cache.stats(),
+            "notes_page_cache": notes_page_cache.stats(),
+            "note_count": note_counter.stats(),
+            "db_pools": {name: metrics.stats() for name, metrics in pool_metrics.items()},
+            "read_coalescing": read_flight.stats(),
+            "compressed_body_cache": compressed_body_cache.stats(),
+            "search_index": search_index.stats(),
+            "facet_index": facet_index.stats(),
+            "cache_invalidation": invalidation_bus.stats() if invalidation_bus else None,
+        },
+    )
@@ -1,17 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy import text
-from sqlalchemy.orm import Session
 from services.note import (
+    autocomplete,
     create_note,
     delete_note,
+    export_notes,
     find_all_notes,
+    note_facets,
+    search_notes,
     find_note_by_id,
     update_note,
 )
-from utils.dependencies import get_db, get_current_user
+from config.db import DBSession
+from repositories.note import FILTER_CONDITIONS
+from utils.dependencies import get_db, get_current_user, open_db
 from config.constants import (
     ERROR_NOTE_FETCHING,
     ERROR_NOTES_FETCHING,
+    ERROR_NOTES_SEARCHING,
+    ERROR_FACETS_FETCHING,
+    ERROR_AUTOCOMPLETE,
     ERROR_NOTE_NOT_FOUND,
     ERROR_CREATE_NOTE,
     ERROR_UPDATE_NOTE,
@@ -20,6 +29,9 @@ from config.constants import (
     SUCCESS_NOTE_UPDATED,
     SUCCESS_NOTE_DELETED,
     SUCCESS_NOTES_FETCHED,
+    SUCCESS_NOTES_SEARCHED,
+    SUCCESS_FACETS_FETCHED,
+    SUCCESS_AUTOCOMPLETE_FETCHED,
     SUCCESS_NOTE_FETCHED,
     API_PREFIX,
 )
@@ -34,6 +46,14 @@ from schemas.note import (
     NotesListResponse,
     DeleteNoteResponse,
     NotesListRequest,
+    NotesPageRequest,
+    NotesExportRequest,
+    NotesSearchRequest,
+    NotesSearchResponse,
+    NoteFacetsRequest,
+    NoteFacetsResponse,
+    AutocompleteRequest,
+    AutocompleteResponse,
 )
 
 note = APIRouter(
@@ -42,93 +62,210 @@ note = APIRouter(
 )
 
 
-@note.post(f"{API_PREFIX}/find_all", response_model=NotesListResponse)
+# Unset keys are left out so a fields projection returns only the selected keys
+@note.post(
+    f"{API_PREFIX}/find_all",
+    response_model=NotesListResponse,
+    response_model_exclude_unset=True,
+)
 async def find_all_notes_route(
     request: NotesListRequest,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
-) -> NotesListResponse:
+) -> dict:
     try:
         page_no = request.pageNo
         page_size = request.pageSize
 
-        notes, total_count = find_all_notes(db, page_no, page_size)
-
-        # Convert notes to list of NoteInDB instances
-        note_list = (
-            [
-                NoteSchema(
-                    **dict(
-                        zip(
-                            [
-                                "note_id",
-                                "title",
-                                "description",
-                                "tag",
-                                "note_subject",
-                                "timestamp",
-                                "author_id",
-                            ],
-                            note,
-                        )
-                    )
-                )
-                for note in notes
-            ]
-            if notes
-            else []
+        notes, total_count, next_cursor = await find_all_notes(
+            db,
+            page_no,
+            page_size,
+            request.cursor,
+            request.countMode,
+            request.fields,
+            request.summary,
+            request.model_dump(include=set(FILTER_CONDITIONS)),
         )
 
-        return NotesListResponse(
-            status=True,
-            detail=SUCCESS_NOTES_FETCHED,
-            total_count=total_count,  # type: ignore
-            data=note_list,
+        # Plain dicts, validated once against response_model
+        return {
+            "status": True,
+            "detail": SUCCESS_NOTES_FETCHED,
+            "total_count": total_count,
+            "data": notes,
+            "next_cursor": next_cursor,
+        }
+    except Exception as e:
+        return {
+            "status": False,
+            "detail": f"{ERROR_NOTES_FETCHING}: {str(e)}",
+            "total_count": 0,
+            "data": [],
+            "next_cursor": None,
+        }
+
+
+# The caller's notes: served by (author_id, timestamp, note_id), with the
+# total counted over the author's notes only
+@note.post(
+    f"{API_PREFIX}/mine",
+    response_model=NotesListResponse,
+    response_model_exclude_unset=True,
+)
+async def find_my_notes_route(
+    request: NotesPageRequest,
+    db: DBSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+) -> dict:
+    try:
+        filters = request.model_dump(include=set(FILTER_CONDITIONS))
+        filters["author_id"] = current_user.user_id
+
+        notes, total_count, next_cursor = await find_all_notes(
+            db,
+            request.pageNo,
+            request.pageSize,
+            request.cursor,
+            request.countMode,
+            request.fields,
+            request.summary,
+            filters,
         )
+
+        return {
+            "status": True,
+            "detail": SUCCESS_NOTES_FETCHED,
+            "total_count": total_count,
+            "data": notes,
+            "next_cursor": next_cursor,
+        }
     except Exception as e:
-        return NotesListResponse(
-            status=False,
-            detail=f"{ERROR_NOTES_FETCHING}: {str(e)}",
-            total_count=0,
-            data=[],
+        return {
+            "status": False,
+            "detail": f"{ERROR_NOTES_FETCHING}: {str(e)}",
+            "total_count": 0,
+            "data": [],
+            "next_cursor": None,
+        }
+
+
+# Relevance-ranked matches, FULLTEXT on MySQL and an in-process index on SQLite
+@note.post(f"{API_PREFIX}/search", response_model=NotesSearchResponse)
+async def search_notes_route(
+    request: NotesSearchRequest,
+    db: DBSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+) -> dict:
+    try:
+        notes, total_count = await search_notes(
+            db, request.query, request.pageNo, request.pageSize
         )
+        return {
+            "status": True,
+            "detail": SUCCESS_NOTES_SEARCHED,
+            "total_count": total_count,
+            "data": notes,
+        }
+    except Exception as e:
+        return {
+            "status": False,
+            "detail": f"{ERROR_NOTES_SEARCHING}: {str(e)}",
+            "total_count": 0,
+            "data": [],
+        }
+
+
+@note.post(f"{API_PREFIX}/facets", response_model=NoteFacetsResponse)
+async def note_facets_route(
+    request: NoteFacetsRequest,
+    db: DBSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+) -> dict:
+    try:
+        counts = await note_facets(db, request.facets, request.author_id, request.limit)
+        return {"status": True, "detail": SUCCESS_FACETS_FETCHED, "data": counts}
+    except Exception as e:
+        return {
+            "status": False,
+            "detail": f"{ERROR_FACETS_FETCHING}: {str(e)}",
+            "data": {},
+        }
 
 
-@note.post(f"{API_PREFIX}/find_one", response_model=NoteResponse)
+@note.post(f"{API_PREFIX}/autocomplete", response_model=AutocompleteResponse)
+async def autocomplete_route(
+    request: AutocompleteRequest,
+    db: DBSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+) -> dict:
+    try:
+        suggestions = await autocomplete(db, request.facet, request.prefix, request.limit)
+        return {"status": True, "detail": SUCCESS_AUTOCOMPLETE_FETCHED, "data": suggestions}
+    except Exception as e:
+        return {
+            "status": False,
+            "detail": f"{ERROR_AUTOCOMPLETE}: {str(e)}",
+            "data": [],
+        }
+
+
+@note.post(f"{API_PREFIX}/export", response_class=StreamingResponse)
+async def export_notes_route(
+    request: NotesExportRequest,
+    current_user: TokenData = Depends(get_current_user),
+) -> StreamingResponse:
+    # One JSON note per line, written as batches arrive from the database
+    async def ndjson_lines():
+        async with open_db() as db:
+            db.info["user_id"] = current_user.user_id
+            async for notes in export_notes(
+                db, request.author_id, request.since, request.until
+            ):
+                yield "".join(
+                    NoteSchema.model_validate(note).model_dump_json() + "\n"
+                    for note in notes
+                )
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+@note.post(
+    f"{API_PREFIX}/find_one",
+    response_model=NoteResponse,
+    response_model_exclude_unset=True,
+)
 async def find_one_note_route(
     request: NoteIdRequest,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
-) -> NoteResponse:
+) -> dict:
     try:
-        note_data = find_note_by_id(db, request.note_id)
+        note_data = await find_note_by_id(db, request.note_id, request.fields)
         if not note_data:
             raise HTTPException(status_code=404, detail=ERROR_NOTE_NOT_FOUND)
 
-        # Convert the note data to NoteInDB instance
-        note_in_db = NoteSchema(**note_data)
-
-        return NoteResponse(
-            status=True,
-            detail=SUCCESS_NOTE_FETCHED.format(note_id=request.note_id),
-            data=note_in_db,
-        )
+        return {
+            "status": True,
+            "detail": SUCCESS_NOTE_FETCHED.format(note_id=request.note_id),
+            "data": note_data,
+        }
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        return NoteResponse(
-            status=False,
-            detail=f"{ERROR_NOTE_FETCHING} with note_id = {request.note_id}: {str(e)}",
-            data=None,
-        )
+        return {
+            "status": False,
+            "detail": f"{ERROR_NOTE_FETCHING} with note_id = {request.note_id}: {str(e)}",
+            "data": None,
+        }
 
 
 @note.post(f"{API_PREFIX}/create", response_model=NoteResponse)
 async def create_note_route(
     note: NoteCreate,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
-) -> NoteResponse:
+) -> dict:
     try:
         # Convert NoteCreate to dictionary
         note_data = note.dict()
@@ -136,57 +273,50 @@ async def create_note_route(
         author_id = current_user.user_id
 
         # Call create_note with note data and author_id
-        new_note = create_note(
+        new_note = await create_note(
             db, note_data, author_id # type: ignore
         )  # Ensure create_note returns the expected format
 
         if not new_note:
-            return NoteResponse(status=False, detail="Error creating note", data=None)
-
-        # Convert result to NoteInDB
-        note_response = NoteSchema(**new_note)  # Use NoteInDB if it's the correct schema
+            return {"status": False, "detail": "Error creating note", "data": None}
 
-        return NoteResponse(
-            status=True,
-            detail=f"{SUCCESS_NOTE_CREATED} with note_id={new_note['note_id']}",
-            data=note_response,
-        )
+        return {
+            "status": True,
+            "detail": f"{SUCCESS_NOTE_CREATED} with note_id={new_note['note_id']}",
+            "data": new_note,
+        }
     except Exception as e:
-        return NoteResponse(
-            status=False, detail=f"{ERROR_CREATE_NOTE}: {str(e)}", data=None
-        )
+        return {"status": False, "detail": f"{ERROR_CREATE_NOTE}: {str(e)}", "data": None}
 
 
 @note.post(f"{API_PREFIX}/update", response_model=NoteResponse)
 async def update_note_route(
     note_update: NoteUpdate,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
-) -> NoteResponse:
+) -> dict:
     try:
         note_data = note_update.dict()
         note_data["author_id"] = current_user.user_id  # Implicitly set author_id
 
-        updated_note = update_note(db, note_data)  # Call the function
+        updated_note = await update_note(db, note_data)  # Call the function
 
         if not updated_note:
-            return NoteResponse(status=False, detail=ERROR_UPDATE_NOTE, data=None)
+            return {"status": False, "detail": ERROR_UPDATE_NOTE, "data": None}
 
-        return NoteResponse(
-            status=True,
-            detail=f"{SUCCESS_NOTE_UPDATED} with note_id={note_update.note_id}",
-            data=NoteSchema(**updated_note),
-        )
+        return {
+            "status": True,
+            "detail": f"{SUCCESS_NOTE_UPDATED} with note_id={note_update.note_id}",
+            "data": updated_note,
+        }
     except Exception as e:
-        return NoteResponse(
-            status=False, detail=f"Failed to update note: {str(e)}", data=None
-        )
+        return {"status": False, "detail": f"Failed to update note: {str(e)}", "data": None}
 
 
 @note.post(f"{API_PREFIX}/delete", response_model=DeleteNoteResponse)
 async def delete_note_route(
     delete_request: DeleteNoteRequest,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ) -> DeleteNoteResponse:
     try:
@@ -195,7 +325,7 @@ async def delete_note_route(
         author_id = current_user.user_id  # Use the current user's ID
 
         # Call the function to delete the note
-        is_deleted = delete_note(db, note_id, author_id) # type: ignore
+        is_deleted = await delete_note(db, note_id, author_id) # type: ignore
 
         if is_deleted:
             return DeleteNoteResponse(
@@ -1,5 +1,4 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
 from services.user import (
     create_user,
     delete_user,
@@ -7,6 +6,7 @@ from services.user import (
     find_user_by_id,
     update_user,
 )
+from config.db import DBSession
 from utils.dependencies import get_db, get_current_user
 from config.constants import (
     ERROR_USER_FETCHING,
@@ -38,10 +38,10 @@ user = APIRouter(
 
 @user.post(f"{API_PREFIX}/find_all", response_model=ResponseModel)
 async def find_all_users_route(
-    db: Session = Depends(get_db), current_user: TokenData = Depends(get_current_user)
+    db: DBSession = Depends(get_db), current_user: TokenData = Depends(get_current_user)
 ) -> ResponseModel:
     try:
-        users = find_all_users(db)
+        users = await find_all_users(db)
         user_list = [UserSchema(**dict(user)) for user in users]
         return ResponseModel(
             status=True,
@@ -58,11 +58,11 @@ async def find_all_users_route(
 @user.post(f"{API_PREFIX}/find_one", response_model=ResponseModel)
 async def find_one_user_route(
     request: UserIdRequest,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ) -> ResponseModel:
     try:
-        user = find_user_by_id(db, request.user_id)
+        user = await find_user_by_id(db, request.user_id)
         if not user:
             return ResponseModel(status=False, detail=ERROR_USER_NOT_FOUND)
         return ResponseModel(
@@ -80,11 +80,11 @@ async def find_one_user_route(
 @user.post(f"{API_PREFIX}/create", response_model=ResponseModel)
 async def create_user_route(
     user: UserCreate,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ) -> ResponseModel:
     try:
-        new_user = create_user(db, user)
+        new_user = await create_user(db, user)
         if not new_user:
             return ResponseModel(status=False, detail="Email already registered")
         return ResponseModel(
@@ -92,6 +92,8 @@ async def create_user_route(
             detail=SUCCESS_USER_CREATED.format(user_id=new_user["user_id"]),  # type: ignore
             data=dict(UserSchema(**dict(new_user))),  # type: ignore
         )
+    except HTTPException as http_exc:
+        raise http_exc
     except Exception as e:
         return ResponseModel(
             status=False,
@@ -102,11 +104,11 @@ async def create_user_route(
 @user.post(f"{API_PREFIX}/update", response_model=ResponseModel)
 async def update_user_route(
     user_update_request: UserUpdateRequest,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ) -> ResponseModel:
     try:
-        updated_user = update_user(db, user_update_request)
+        updated_user = await update_user(db, user_update_request)
         if not updated_user:
             return ResponseModel(status=False, detail=ERROR_USER_NOT_FOUND)
         return ResponseModel(
@@ -114,6 +116,8 @@ async def update_user_route(
             detail=SUCCESS_USER_UPDATED.format(user_id=user_update_request.user_id),
             data=UserSchema(**dict(updated_user)),  # type: ignore
         )
+    except HTTPException as http_exc:
+        raise http_exc
     except Exception as e:
         return ResponseModel(status=False, detail=f"{ERROR_UPDATE_USER}: {str(e)}")
 
@@ -121,11 +125,11 @@ async def update_user_route(
 @user.post(f"{API_PREFIX}/delete", response_model=ResponseModel)
 async def delete_user_route(
     user_id_request: UserIdRequest,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ) -> ResponseModel:
     try:
-        result = delete_user(db, user_id_request.user_id)
+        result = await delete_user(db, user_id_request.user_id)
         return ResponseModel(
             status=True,
             detail=SUCCESS_USER_DELETED.format(user_id=user_id_request.user_id),
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Annotated, Dict, Optional, List, Literal, Union
 from datetime import datetime
 
 
@@ -14,12 +14,26 @@ class NoteCreate(NoteBase):
     author_name: str
 
 
+NoteField = Literal[
+    "note_id",
+    "title",
+    "description",
+    "tag",
+    "note_subject",
+    "timestamp",
+    "author_id",
+    "excerpt",  # first 200 characters of description
+    "description_length",  # in bytes
+]
+
+
 class NoteRequest(BaseModel):
     note_id: int
 
 
 class NoteIdRequest(BaseModel):
     note_id: int
+    fields: Optional[List[NoteField]] = None  # see NotesListRequest.fields
 
 
 class NoteUpdate(BaseModel):
@@ -42,22 +56,121 @@ class NoteInDB(NoteBase):
         from_attributes = True
 
 
-class NotesListRequest(BaseModel):
-    pageNo: int = Field(..., ge=1)  # Page number should be >= 1
+# Body of /notes/mine, scoped to the caller's notes
+class NotesPageRequest(BaseModel):
+    pageNo: int = Field(1, ge=1)  # Page number should be >= 1
     pageSize: int = Field(..., ge=1)  # Page size should be >= 1
+    cursor: Optional[str] = None  # next_cursor of the previous page, overrides pageNo
+    # exact: CountAllNotes, maintained: in-process counter, approximate: table
+    # statistics, none: total_count is omitted
+    countMode: Literal["exact", "maintained", "approximate", "none"] = "maintained"
+    # Columns to read and return, note_id and timestamp are always included
+    fields: Optional[List[NoteField]] = None
+    # Replace description with excerpt and description_length, find_one has the full text
+    summary: bool = False
+    # Filters, combinable with each other, pagination and every countMode
+    # (total_count is then the number of matching notes)
+    tag: Optional[str] = None
+    note_subject: Optional[str] = None
+    since: Optional[datetime] = None  # inclusive
+    until: Optional[datetime] = None  # exclusive
+
+
+class NotesListRequest(NotesPageRequest):
+    author_id: Optional[int] = None
+
+
+# A note read with fields, only the selected keys are present in the response
+class NotePartial(BaseModel):
+    note_id: int
+    timestamp: datetime
+    title: Optional[str] = None
+    description: Optional[str] = None
+    tag: Optional[str] = None
+    note_subject: Optional[str] = None
+    author_id: Optional[int] = None
+    excerpt: Optional[str] = None
+    description_length: Optional[int] = None
+
+
+NoteData = Annotated[Union[NoteInDB, NotePartial], Field(union_mode="left_to_right")]
+
+
+class NotesSearchRequest(BaseModel):
+    # Words matched against title, description, tag and note_subject
+    query: str = Field(..., min_length=1, max_length=255)
+    pageNo: int = Field(1, ge=1)
+    pageSize: int = Field(..., ge=1)
+
+
+class NoteSearchHit(BaseModel):
+    note_id: int
+    title: str
+    tag: Optional[str] = None
+    note_subject: Optional[str] = None
+    timestamp: datetime
+    author_id: int
+    score: float  # relevance, higher is better
+    snippet: str  # HTML-escaped description excerpt, matches wrapped in <mark>
+
+
+class NotesSearchResponse(BaseModel):
+    status: bool
+    detail: str
+    total_count: Optional[int] = None
+    data: List[NoteSearchHit]
+
+
+NoteFacet = Literal["tag", "note_subject"]
+
+
+class NoteFacetsRequest(BaseModel):
+    facets: List[NoteFacet] = ["tag", "note_subject"]
+    author_id: Optional[int] = None  # counts over all authors when omitted
+    limit: int = Field(50, ge=1, le=1000)  # values per facet, most used first
+
+
+class AutocompleteRequest(BaseModel):
+    facet: NoteFacet = "tag"
+    prefix: str = Field(..., min_length=1, max_length=255)  # case-insensitive
+    limit: int = Field(10, ge=1, le=100)
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class NoteFacetsResponse(BaseModel):
+    status: bool
+    detail: str
+    data: Dict[str, List[FacetCount]]
+
+
+class AutocompleteResponse(BaseModel):
+    status: bool
+    detail: str
+    data: List[FacetCount]
+
+
+class NotesExportRequest(BaseModel):
+    author_id: Optional[int] = None
+    since: Optional[datetime] = None  # inclusive
+    until: Optional[datetime] = None  # exclusive
 
 
 class NoteResponse(BaseModel):
     status: bool
     detail: str
-    data: Optional[NoteInDB]  # Use Optional to handle the case where no note is found
+    data: Optional[NoteData]  # Use Optional to handle the case where no note is found
 
 
 class NotesListResponse(BaseModel):
     status: bool
     detail: str
-    total_count: int
-    data: List[NoteInDB]
+    total_count: Optional[int] = None
+    data: List[NoteData]
+    next_cursor: Optional[str] = None  # None on the last page
 
 
 class DeleteNoteRequest(BaseModel):
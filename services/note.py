@@ -1,5 +1,5 @@
-from typing import Dict, Optional
-from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
 from config.constants import (
@@ -10,50 +10,247 @@ from config.constants import (
     ERROR_DATABASE_ERROR,
 )
 from schemas.note import NoteUpdate
+from config.db import DBSession, USE_SQLITE, read_route
+from repositories.note import (
+    FILTER_CONDITIONS,
+    NOTE_FIELDS,
+    FACET_FIELDS,
+    SEARCH_FIELDS,
+    facet_values_query,
+    filtered_count_query,
+    notes_by_ids_query,
+    note_from_row,
+    replaced_facets_from_row,
+    project_note,
+    projected_fields,
+    projected_note_query,
+    projected_page_query,
+    search_documents_query,
+    select_notes,
+    summary_fields,
+)
+from config.settings import (
+    EXPORT_BATCH_SIZE,
+    NEGATIVE_CACHE_TTL,
+    NOTE_COUNT_RECONCILE_SECONDS,
+    SEARCH_SNIPPET_LENGTH,
+)
+from utils.autocomplete import facet_index
+from utils.cache import NOT_FOUND, note_cache, notes_page_cache, served_from_cache
+from utils.counter import MaintainedCounter
+from utils.database import execute, commit, rollback, stream
+from utils.pagination import decode_cursor, encode_cursor
+from utils.search import highlight, search_index
+from utils.singleflight import read_flight
+
+# Total number of notes, adjusted by create_note/delete_note
+note_counter = MaintainedCounter(NOTE_COUNT_RECONCILE_SECONDS)
+
+
+async def count_notes(
+    db: DBSession, count_mode: str = "maintained", filters: Optional[dict] = None
+) -> Optional[int]:
+    if count_mode == "none":
+        return None
+    if filters:
+        # Neither the counter nor table statistics know about filters
+        query = filtered_count_query(tuple(filters))
+        return (await execute(db, query, filters)).scalar()
+    if count_mode == "approximate":
+        return (await execute(db, text("CALL ApproxCountNotes()"))).scalar()
+
+    if count_mode == "exact" or note_counter.needs_reconcile():
+        total_count = (await execute(db, text("CALL CountAllNotes()"))).scalar()
+        note_counter.reconcile(total_count)  # type: ignore
+        return total_count
+    return note_counter.value
+
+
+# None (or every field) selects full rows from the procedures
+def _normalize_fields(fields: Optional[Sequence[str]]) -> Optional[tuple[str, ...]]:
+    if not fields:
+        return None
+    fields = tuple(sorted(set(fields)))
+    return None if projected_fields(fields) == NOTE_FIELDS else fields
+
+
+# Drops unset filters and binds timestamps as naive UTC, like the stored values
+def _normalize_filters(filters: Optional[dict]) -> dict:
+    normalized = {}
+    for name in FILTER_CONDITIONS:
+        value = (filters or {}).get(name)
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        if value is not None:
+            normalized[name] = value
+    return normalized
+
+
+async def find_all_notes(
+    db: DBSession,
+    page_no: int,
+    page_size: int,
+    cursor: Optional[str] = None,
+    count_mode: str = "maintained",
+    fields: Optional[Sequence[str]] = None,
+    summary: bool = False,
+    filters: Optional[dict] = None,
+):
+    # Summaries carry a stored excerpt instead of the full description
+    fields = _normalize_fields(summary_fields(fields) if summary else fields)
+    filters = _normalize_filters(filters)
+    cache_key = (
+        None if cursor else page_no,
+        cursor,
+        page_size,
+        count_mode,
+        fields,
+        tuple(filters.items()),
+    )
+    cached_page = await notes_page_cache.get(cache_key)
+    if cached_page is not None:
+        served_from_cache.set(True)
+        return cached_page
 
+    # Concurrent misses for the same page share one query
+    return await read_flight.do(
+        ("notes_page", read_route(db), cache_key),
+        lambda: _load_notes_page(
+            db, cache_key, page_no, page_size, cursor, count_mode, fields, filters
+        ),
+    )
 
-def find_all_notes(db: Session, page_no: int, page_size: int):
+
+async def _load_notes_page(
+    db: DBSession,
+    cache_key: tuple,
+    page_no: int,
+    page_size: int,
+    cursor: Optional[str],
+    count_mode: str,
+    fields: Optional[tuple[str, ...]],
+    filters: dict,
+):
+    version = await notes_page_cache.version()
     try:
-        offset = (page_no - 1) * page_size
-        result = db.execute(
-            text("CALL FindAllNotes(:offset, :limit)"),
-            {"offset": offset, "limit": page_size},
+        if fields or filters:
+            # Projected and/or filtered: only the requested columns (plus
+            # note_id, timestamp) of the matching rows
+            cursor_ts, cursor_id = decode_cursor(cursor) if cursor else (None, None)
+            result = await execute(
+                db,
+                projected_page_query(fields or NOTE_FIELDS, bool(cursor), tuple(filters)),
+                {
+                    **filters,
+                    "cursor_ts": cursor_ts,
+                    "cursor_id": cursor_id,
+                    "limit": page_size,
+                    "offset": 0 if cursor else (page_no - 1) * page_size,
+                },
+            )
+            notes = [note._asdict() for note in result]
+        elif cursor:
+            # Keyset seek on (timestamp, note_id), cost does not grow with depth
+            cursor_ts, cursor_id = decode_cursor(cursor)
+            result = await execute(
+                db,
+                text("CALL FindNotesAfter(:cursor_ts, :cursor_id, :limit)"),
+                {"cursor_ts": cursor_ts, "cursor_id": cursor_id, "limit": page_size},
+            )
+            notes = [note_from_row(note) for note in result]
+        else:
+            offset = (page_no - 1) * page_size
+            result = await execute(
+                db,
+                text("CALL FindAllNotes(:offset, :limit)"),
+                {"offset": offset, "limit": page_size},
+            )
+            notes = [note_from_row(note) for note in result]
+
+        # A full page means there may be more rows after the last one
+        next_cursor = (
+            encode_cursor(notes[-1]["timestamp"], notes[-1]["note_id"])
+            if len(notes) == page_size
+            else None
         )
-        notes = result.fetchall()
 
         # To get total_count
-        total_count_result = db.execute(text("CALL CountAllNotes()"))
-        total_count = total_count_result.scalar()
+        total_count = await count_notes(db, count_mode, filters)
 
-        return notes, total_count
+        await notes_page_cache.set(
+            cache_key, (notes, total_count, next_cursor), version=version
+        )
+        return notes, total_count, next_cursor
     except SQLAlchemyError as e:
         raise Exception(ERROR_DATABASE_ERROR + ": " + str(e))
 
 
-def find_note_by_id(db: Session, note_id: int):
+async def find_note_by_id(
+    db: DBSession, note_id: int, fields: Optional[Sequence[str]] = None
+):
+    fields = _normalize_fields(fields)
+    # Copies keep callers from mutating the cached entry
+    cached_note = await note_cache.get(note_id)
+    if cached_note is NOT_FOUND:
+        raise Exception(f"An unexpected error occurred: {ERROR_NOTE_FETCHING}")
+    if cached_note is not None and not fields:
+        served_from_cache.set(True)
+        return dict(cached_note)
+    if cached_note is not None and set(fields).issubset(NOTE_FIELDS):  # type: ignore
+        served_from_cache.set(True)
+        return project_note(cached_note, fields)  # type: ignore
+
+    if fields:
+        return await read_flight.do(
+            ("note", read_route(db), note_id, fields),
+            lambda: _load_projected_note(db, note_id, fields),
+        )
+
+    # Concurrent misses for the same note share one FindOneNote call
+    note_dict = await read_flight.do(
+        ("note", read_route(db), note_id), lambda: _load_note(db, note_id)
+    )
+    return dict(note_dict)
+
+
+async def _cache_loaded_note(note_id: int, value, version: int, ttl=None):
+    # Note writes bump the notes version before dropping the note_cache entry.
+    # If it moved since version was read, a write committed during the load
+    # and value may predate it, so it must not outlive that write's delete.
+    await note_cache.set(note_id, value, ttl)
+    if await notes_page_cache.version() != version:
+        await note_cache.delete(note_id)
+
+
+async def _load_projected_note(db: DBSession, note_id: int, fields: tuple[str, ...]):
+    version = await notes_page_cache.version()
+    try:
+        result = await execute(db, projected_note_query(fields), {"note_id": note_id})
+        note = result.first()
+    except SQLAlchemyError as e:
+        raise Exception(ERROR_DATABASE_ERROR + ": " + str(e))
+    if note is None:
+        await _cache_loaded_note(note_id, NOT_FOUND, version, NEGATIVE_CACHE_TTL)
+        raise Exception(f"An unexpected error occurred: {ERROR_NOTE_FETCHING}")
+    return note._asdict()
+
+
+async def _load_note(db: DBSession, note_id: int):
+    version = await notes_page_cache.version()
     try:
-        result = db.execute(text("CALL FindOneNote(:note_id)"), {"note_id": note_id})
+        result = await execute(db, text("CALL FindOneNote(:note_id)"), {"note_id": note_id})
 
         # Fetch one record from the result
         note = result.fetchone()
 
-        # Check if the note exists
+        # Check if the note exists, remember the miss for pollers of deleted notes
         if note is None:
+            await _cache_loaded_note(note_id, NOT_FOUND, version, NEGATIVE_CACHE_TTL)
             raise Exception(ERROR_NOTE_FETCHING)
 
-        # Convert tuple to dictionary manually if needed
-        note_dict = {
-            "note_id": note[
-                0
-            ],  # Indexes should correspond to the order of fields in the procedure's result
-            "title": note[1],
-            "description": note[2],
-            "tag": note[3],
-            "note_subject": note[4],
-            "timestamp": note[5],
-            "author_id": note[6],
-        }
+        note_dict = note_from_row(note)
 
+        await _cache_loaded_note(note_id, note_dict, version)
         return note_dict
 
     except SQLAlchemyError as e:
@@ -62,10 +259,103 @@ def find_note_by_id(db: Session, note_id: int):
         raise Exception(f"An unexpected error occurred: {str(e)}")
 
 
-def create_note(db: Session, note_data: dict, author_id: int):
+async def export_notes(
+    db: DBSession,
+    author_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    # Batches of note dicts, EXPORT_BATCH_SIZE rows per fetch from a server-side cursor
+    query = select_notes(author_id, since, until)
+    async for rows in stream(db, query, EXPORT_BATCH_SIZE):
+        yield [note_from_row(row) for row in rows]
+
+
+async def search_notes(db: DBSession, query: str, page_no: int, page_size: int):
+    offset = (page_no - 1) * page_size
+    try:
+        if USE_SQLITE:
+            # No FULLTEXT in SQLite, rank with the in-process index instead
+            if search_index.needs_reload():
+                await read_flight.do(("search_index",), lambda: _load_search_index(db))
+            matches = search_index.search(query)
+            total_count = len(matches)
+            page = matches[offset : offset + page_size]
+            notes = []
+            if page:
+                result = await execute(
+                    db, notes_by_ids_query, {"note_ids": [note_id for note_id, _ in page]}
+                )
+                rows = {row[0]: note_from_row(row) for row in result}
+                notes = [
+                    {**rows[note_id], "score": score}
+                    for note_id, score in page
+                    if note_id in rows
+                ]
+        else:
+            result = await execute(
+                db,
+                text("CALL SearchNotes(:query, :offset, :limit)"),
+                {"query": query, "offset": offset, "limit": page_size},
+            )
+            # SearchNotes adds the relevance score after the note columns
+            notes = [{**note_from_row(row), "score": row[-1]} for row in result]
+            total_count = (
+                await execute(db, text("CALL CountSearchNotes(:query)"), {"query": query})
+            ).scalar()
+    except SQLAlchemyError as e:
+        raise Exception(ERROR_DATABASE_ERROR + ": " + str(e))
+
+    # Hits carry a highlighted snippet instead of the full description
+    for note in notes:
+        note["snippet"] = highlight(note.pop("description"), query, SEARCH_SNIPPET_LENGTH)
+    return notes, total_count
+
+
+async def _load_search_index(db: DBSession):
+    generation = search_index.generation
+    result = await execute(db, search_documents_query)
+    search_index.load(((row[0], row[1:]) for row in result), generation)
+
+
+async def note_facets(
+    db: DBSession, facets: Sequence[str], author_id: Optional[int], limit: int
+) -> Dict[str, list]:
+    # Counts come from the trigger-maintained note_facets table
+    counts = {}
+    try:
+        for facet in facets:
+            result = await execute(
+                db,
+                text("CALL NoteFacets(:facet, :author_id, :limit)"),
+                {"facet": facet, "author_id": author_id, "limit": limit},
+            )
+            counts[facet] = [{"value": row[0], "count": int(row[1])} for row in result]
+    except SQLAlchemyError as e:
+        raise Exception(ERROR_DATABASE_ERROR + ": " + str(e))
+    return counts
+
+
+async def autocomplete(db: DBSession, facet: str, prefix: str, limit: int) -> list:
+    if facet_index.needs_reload():
+        await read_flight.do(("facet_index",), lambda: _load_facet_index(db))
+    return facet_index.lookup(facet, prefix, limit)
+
+
+async def _load_facet_index(db: DBSession):
+    generation = facet_index.generation
+    try:
+        result = await execute(db, facet_values_query)
+        facet_index.load(result.fetchall(), generation)
+    except SQLAlchemyError as e:
+        raise Exception(ERROR_DATABASE_ERROR + ": " + str(e))
+
+
+async def create_note(db: DBSession, note_data: dict, author_id: int):
     try:
         # Call CreateNote procedure
-        result = db.execute(
+        result = await execute(
+            db,
             text(
                 "CALL CreateNote(:title, :description, :tag, :note_subject, :author_id)"
             ),
@@ -77,43 +367,31 @@ def create_note(db: Session, note_data: dict, author_id: int):
                 "author_id": author_id,
             },
         )
-        db.commit()
-
-        # Retrieve the ID of the newly created note
-        note_id = result.fetchone()[0]  # type: ignore # Ensure this matches your stored procedure output
-
-        # Get the full details of the newly created note
-        result = db.execute(text("CALL GetNoteById(:note_id)"), {"note_id": note_id})
+        # CreateNote returns the inserted row, no read back needed
         created_note = result.fetchone()
-
-        if created_note:
-            # Convert the result to a dictionary and return
-            return dict(
-                zip(
-                    [
-                        "note_id",
-                        "title",
-                        "description",
-                        "tag",
-                        "note_subject",
-                        "timestamp",
-                        "author_id",
-                    ],
-                    created_note,
-                )
-            )
-        else:
+        await commit(db)
+        note_counter.add(1)
+        await notes_page_cache.bump()
+        if created_note is None:
             return None
 
+        # Drop a remembered miss for the new id
+        await note_cache.delete(created_note[0])
+        note = note_from_row(created_note)
+        facet_index.update(None, {field: note[field] for field in FACET_FIELDS})
+        search_index.add(note["note_id"], [note[field] for field in SEARCH_FIELDS])
+        return note
+
     except SQLAlchemyError as e:
-        db.rollback()
+        await rollback(db)
         raise Exception(ERROR_CREATE_NOTE + ": " + str(e))
 
 
-def update_note(db: Session, note_update_data: dict):
+async def update_note(db: DBSession, note_update_data: dict):
     try:
         # Call the UpdateNote stored procedure
-        result = db.execute(
+        result = await execute(
+            db,
             text(
                 "CALL UpdateNote(:note_id, :title, :description, :tag, :note_subject, :author_id)"
             ),
@@ -128,50 +406,50 @@ def update_note(db: Session, note_update_data: dict):
                 ],  # Ensure this is present and correct
             },
         )
-        db.commit()
-
-        # Fetch the updated note details
-        result = db.execute(
-            text("CALL GetNoteById(:note_id)"), {"note_id": note_update_data["note_id"]}
-        )
+        # UpdateNote returns the row as stored after the update, followed by
+        # the facet values it replaced
         updated_note = result.fetchone()
+        await commit(db)
+        await notes_page_cache.bump()
+        await note_cache.delete(note_update_data["note_id"])
 
         if updated_note:
-            # Map the result to a dictionary if necessary
-            updated_note_dict = dict(
-                zip(
-                    [
-                        "note_id",
-                        "title",
-                        "description",
-                        "tag",
-                        "note_subject",
-                        "timestamp",
-                        "author_id",
-                    ],
-                    updated_note,
+            note = note_from_row(updated_note)
+            if any(note_update_data.get(field) is not None for field in FACET_FIELDS):
+                facet_index.update(
+                    replaced_facets_from_row(updated_note),
+                    {field: note[field] for field in FACET_FIELDS},
                 )
-            )
-            return updated_note_dict
+            search_index.add(note["note_id"], [note[field] for field in SEARCH_FIELDS])
+            return note
         return None
     except SQLAlchemyError as e:
-        db.rollback()
+        await rollback(db)
         raise Exception(f"Failed to update note: {str(e)}")
 
 
-def delete_note(db: Session, note_id: int, author_id: int) -> bool:
+async def delete_note(db: DBSession, note_id: int, author_id: int) -> bool:
     try:
-        result = db.execute(
+        result = await execute(
+            db,
             text("CALL DeleteNote(:note_id, :author_id)"),
             {"note_id": note_id, "author_id": author_id},
         )
-        db.commit()
+        # DeleteNote returns the deleted note's facet values, no row if
+        # nothing was deleted
+        deleted_note = result.fetchone()
+        await commit(db)
+        await notes_page_cache.bump()
+        await note_cache.delete(note_id)
 
         # Check if the deletion was successful
-        if result.rowcount > 0: # type: ignore
+        if deleted_note is not None:
+            note_counter.add(-1)
+            facet_index.update(replaced_facets_from_row(deleted_note), None)
+            search_index.remove(note_id)
             return True
         else:
             return False
     except SQLAlchemyError as e:
-        db.rollback()
+        await rollback(db)
         raise Exception(f"Failed to delete note: {str(e)}")
@@ -1,41 +1,54 @@
-from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from schemas.user import UserCreate, UserUpdateRequest
-from utils.authentication import get_password_hash
+from utils.authentication import get_password_hash_async
+from config.db import DBSession, read_route
+from services.note import note_counter
+from utils.autocomplete import facet_index
+from utils.cache import note_cache, notes_page_cache, principal_cache
+from utils.database import execute, commit, rollback
+from utils.search import search_index
+from utils.singleflight import read_flight
 
 
-def find_all_users(db: Session):
-    result = db.execute(text("CALL GetAllUsers();"))
+async def find_all_users(db: DBSession):
+    return await read_flight.do(("users", read_route(db)), lambda: _load_all_users(db))
+
+async def _load_all_users(db: DBSession):
+    result = await execute(db, text("CALL GetAllUsers();"))
     return result.mappings().all()
 
-def find_user_by_id(db: Session, user_id: int):
-    result = db.execute(text("CALL GetUserById(:userId)"), {"userId": user_id})
+async def find_user_by_id(db: DBSession, user_id: int):
+    return await read_flight.do(
+        ("user", read_route(db), user_id), lambda: _load_user(db, user_id)
+    )
+
+async def _load_user(db: DBSession, user_id: int):
+    result = await execute(db, text("CALL GetUserById(:userId)"), {"userId": user_id})
     return result.mappings().first()
 
-def create_user(db: Session, user: UserCreate):
-    existing_user = (
-        db.execute(text("CALL GetUserByEmail(:email)"), {"email": user.email})
-        .mappings()
-        .first()
-    )
-    if existing_user:
+async def create_user(db: DBSession, user: UserCreate):
+    hashed_password = await get_password_hash_async(user.password)
+    try:
+        # CreateUser returns the new row, the unique email index rejects duplicates
+        result = await execute(
+            db,
+            text("CALL CreateUser(:name, :email, :password)"),
+            {"name": user.name, "email": user.email, "password": hashed_password},
+        )
+        new_user = result.mappings().first()
+        await commit(db)
+    except IntegrityError:
+        await rollback(db)
         return None
+    # Drop a remembered miss for the new id
+    if new_user:
+        await principal_cache.delete(new_user["user_id"])
+    return new_user
 
-    hashed_password = get_password_hash(user.password)
-    db.execute(
-        text("CALL CreateUser(:name, :email, :password)"),
-        {"name": user.name, "email": user.email, "password": hashed_password},
-    )
-    db.commit()
-    return (
-        db.execute(text("CALL GetUserByEmail(:email)"), {"email": user.email})
-        .mappings()
-        .first()
-    )
-
-def update_user(db: Session, user_update_request: UserUpdateRequest):
+async def update_user(db: DBSession, user_update_request: UserUpdateRequest):
     hashed_password = (
-        get_password_hash(user_update_request.password)
+        await get_password_hash_async(user_update_request.password)
         if user_update_request.password
         else None
     )
@@ -45,19 +58,26 @@ def update_user(db: Session, user_update_request: UserUpdateRequest):
         "email": user_update_request.email,
         "password": hashed_password,
     }
-    db.execute(
-        text("CALL UpdateUser(:userId, :name, :email, :password)"), update_params
-    )
-    db.commit()
-    return (
-        db.execute(
-            text("CALL GetUserById(:userId)"), {"userId": user_update_request.user_id}
-        )
-        .mappings()
-        .first()
+    # UpdateUser returns the updated row, or nothing for an unknown user_id
+    result = await execute(
+        db, text("CALL UpdateUser(:userId, :name, :email, :password)"), update_params
     )
+    updated_user = result.mappings().first()
+    await commit(db)
+    await principal_cache.delete(user_update_request.user_id)
+    return updated_user
 
-def delete_user(db: Session, user_id: int):
-    db.execute(text("CALL DeleteUser(:userId)"), {"userId": user_id})
-    db.commit()
+async def delete_user(db: DBSession, user_id: int):
+    await execute(db, text("CALL DeleteUser(:userId)"), {"userId": user_id})
+    await commit(db)
+    # Bumped first so a principal load racing this delete drops what it
+    # cached, see get_current_user
+    await principal_cache.increment("version")
+    await principal_cache.delete(user_id)
+    # DeleteUser also removes the user's notes
+    await notes_page_cache.bump()
+    await note_cache.clear()
+    note_counter.invalidate()
+    search_index.clear()
+    facet_index.invalidate()
     return {"user_id": user_id}
@@ -0,0 +1,132 @@
+import asyncio
+import fnmatch
+import time
+from typing import Any, Optional
+
+
+# In-process server speaking enough of the Redis protocol (RESP2) for
+# RedisStore and RedisInvalidationBus: strings with PX expiry, DEL, SCAN,
+# INCR and pub/sub. advance() moves its clock forward to expire keys.
+class FakeRedisServer:
+    def __init__(self):
+        self.data: dict[bytes, tuple[bytes, Optional[float]]] = {}
+        self.subscribers: dict[bytes, set[asyncio.StreamWriter]] = {}
+        self.offset = 0.0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]  # type: ignore
+        return f"redis://127.0.0.1:{port}/0"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def close(self):
+        self._server.close()  # type: ignore
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()  # type: ignore
+
+    def advance(self, seconds: float):
+        self.offset += seconds
+
+    def _now(self) -> float:
+        return time.monotonic() + self.offset
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self._now():
+            del self.data[key]
+            return None
+        return value
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while True:
+                command = await _read_command(reader)
+                if command is None:
+                    break
+                writer.write(_encode(self._execute(command, writer)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            for writers in self.subscribers.values():
+                writers.discard(writer)
+            writer.close()
+
+    def _execute(self, command: list[bytes], writer: asyncio.StreamWriter) -> Any:
+        name, args = command[0].upper(), command[1:]
+        if name in (b"PING",):
+            return "PONG"
+        if name in (b"CLIENT", b"SELECT", b"AUTH"):
+            return "OK"
+        if name == b"GET":
+            return self._get(args[0])
+        if name == b"SET":
+            expires_at = None
+            if len(args) > 3 and args[2].upper() == b"PX":
+                expires_at = self._now() + int(args[3]) / 1000
+            self.data[args[0]] = (args[1], expires_at)
+            return "OK"
+        if name == b"DEL":
+            return sum(self.data.pop(key, None) is not None for key in args)
+        if name == b"INCR":
+            value = int(self._get(args[0]) or 0) + 1
+            self.data[args[0]] = (str(value).encode(), None)
+            return value
+        if name == b"SCAN":
+            # Everything in one batch
+            pattern = args[args.index(b"MATCH") + 1].decode() if b"MATCH" in args else "*"
+            keys = [
+                key
+                for key in list(self.data)
+                if self._get(key) is not None and fnmatch.fnmatchcase(key.decode(), pattern)
+            ]
+            return [b"0", keys]
+        if name == b"PUBLISH":
+            writers = self.subscribers.get(args[0], set())
+            for subscriber in writers:
+                subscriber.write(_encode([b"message", args[0], args[1]]))
+            return len(writers)
+        if name == b"SUBSCRIBE":
+            self.subscribers.setdefault(args[0], set()).add(writer)
+            return [b"subscribe", args[0], 1]
+        if name == b"UNSUBSCRIBE":
+            for channel in args or list(self.subscribers):
+                self.subscribers.get(channel, set()).discard(writer)
+            return [b"unsubscribe", args[0] if args else None, 0]
+        return Exception(f"unknown command '{name.decode()}'")
+
+
+async def _read_command(reader: asyncio.StreamReader) -> Optional[list[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    count = int(line[1:-2])
+    command = []
+    for _ in range(count):
+        length = int((await reader.readline())[1:-2])
+        command.append((await reader.readexactly(length + 2))[:-2])
+    return command
+
+
+def _encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, Exception):
+        return b"-ERR %s\r\n" % str(value).encode()
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    return b"*%d\r\n" % len(value) + b"".join(_encode(item) for item in value)
@@ -0,0 +1,113 @@
+from utils.autocomplete import PrefixIndex
+
+ROWS = [
+    ("tag", "Python", 3),
+    ("tag", "pytest", 5),
+    ("tag", "pyramid", 1),
+    ("tag", "rust", 2),
+    ("note_subject", "python", 4),
+]
+
+
+def loaded_index(rows=ROWS) -> PrefixIndex:
+    index = PrefixIndex(refresh_seconds=60)
+    index.load(rows, index.generation)
+    return index
+
+
+def values(index: PrefixIndex, facet: str, prefix: str, limit: int = 10) -> list:
+    return [(hit["value"], hit["count"]) for hit in index.lookup(facet, prefix, limit)]
+
+
+def test_lookup_ranks_by_count_within_prefix():
+    index = loaded_index()
+    assert values(index, "tag", "py") == [("pytest", 5), ("Python", 3), ("pyramid", 1)]
+    assert values(index, "tag", "py", limit=2) == [("pytest", 5), ("Python", 3)]
+    assert values(index, "note_subject", "py") == [("python", 4)]
+
+
+def test_lookup_prefix_bounds():
+    index = loaded_index()
+    assert values(index, "tag", "PYT") == [("pytest", 5), ("Python", 3)]
+    assert values(index, "tag", "python") == [("Python", 3)]
+    assert values(index, "tag", "pythons") == []
+    assert values(index, "tag", "q") == []
+    assert values(index, "tag", "z") == []
+    assert [value for value, _ in values(index, "tag", "")] == [
+        "pytest",
+        "Python",
+        "rust",
+        "pyramid",
+    ]
+    assert values(index, "unknown", "") == []
+
+
+def test_case_variants_are_separate_values():
+    index = loaded_index(ROWS + [("tag", "python", 2)])
+    assert values(index, "tag", "python") == [("Python", 3), ("python", 2)]
+    index.update({"tag": "python"}, None)
+    index.update({"tag": "python"}, None)
+    assert values(index, "tag", "python") == [("Python", 3)]
+
+
+def test_delta_adds_and_removes_values():
+    index = loaded_index()
+    index.update(None, {"tag": "pydantic", "note_subject": "rust"})
+    assert values(index, "tag", "pyd") == [("pydantic", 1)]
+    assert values(index, "note_subject", "") == [("python", 4), ("rust", 1)]
+
+    # Moving a note from one tag to another
+    index.update({"tag": "pyramid"}, {"tag": "rust"})
+    assert values(index, "tag", "pyr") == []
+    assert values(index, "tag", "rust") == [("rust", 3)]
+
+    index.update({"tag": "pydantic", "note_subject": "rust"}, None)
+    assert values(index, "tag", "pyd") == []
+    assert values(index, "note_subject", "") == [("python", 4)]
+    assert index.stats()["values"] == {"tag": 3, "note_subject": 1}
+
+
+def test_delta_for_unchanged_or_missing_values():
+    index = loaded_index()
+    index.update({"tag": "rust", "note_subject": None}, {"tag": "rust", "note_subject": None})
+    assert values(index, "tag", "rust") == [("rust", 2)]
+
+    # A value the loaded rows don't contain (written by another worker since)
+    index.update({"tag": "unseen"}, None)
+    assert values(index, "tag", "unseen") == []
+    index.update({"tag": "unseen"}, {"tag": "rust"})
+    assert values(index, "tag", "rust") == [("rust", 3)]
+    index.update(None, {"tag": "unseen"})
+    assert values(index, "tag", "unseen") == [("unseen", 1)]
+
+
+def test_delta_before_load_is_ignored():
+    index = PrefixIndex(refresh_seconds=60)
+    index.update(None, {"tag": "rust"})
+    assert not index.loaded
+    assert index.needs_reload()
+    assert values(index, "tag", "") == []
+
+
+def test_load_that_raced_a_write_stays_stale():
+    index = PrefixIndex(refresh_seconds=60)
+    generation = index.generation
+    index.update(None, {"tag": "rust"})
+    index.load(ROWS, generation)
+    # Used as is, but reloaded on the next lookup
+    assert values(index, "tag", "rust") == [("rust", 2)]
+    assert index.needs_reload()
+
+    index.load(ROWS, index.generation)
+    assert not index.needs_reload()
+    assert index.reloads == 2
+
+
+def test_invalidate_and_refresh_interval():
+    index = loaded_index()
+    index.invalidate()
+    assert index.needs_reload()
+
+    index = PrefixIndex(refresh_seconds=0)
+    index.load(ROWS, index.generation)
+    assert index.needs_reload()
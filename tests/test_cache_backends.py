@@ -0,0 +1,206 @@
+import asyncio
+from importlib.util import find_spec
+import pytest
+from utils.cache import TTLCache, VersionedCache
+from utils.cache_backends import (
+    LocalCache,
+    RedisInvalidationBus,
+    RedisStore,
+    SharedCache,
+    SharedMemoryStore,
+)
+from tests.fake_redis import FakeRedisServer
+
+# redis is an optional dependency, only needed for CACHE_BACKEND=redis
+requires_redis = pytest.mark.skipif(
+    find_spec("redis") is None, reason="the redis package is not installed"
+)
+
+
+def with_fake_redis(test):
+    async def run():
+        server = FakeRedisServer()
+        await server.start()
+        try:
+            await test(server)
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+
+
+async def wait_for(condition, timeout: float = 2.0):
+    for _ in range(int(timeout / 0.01)):
+        if await condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met in time")
+
+
+@requires_redis
+def test_redis_store_get_set_delete():
+    async def test(server):
+        store = RedisStore(server.url)
+        assert await store.get("missing") is None
+        await store.set("key", b"value", 10)
+        assert await store.get("key") == b"value"
+        await store.delete("key")
+        assert await store.get("key") is None
+        await store.close()
+
+    with_fake_redis(test)
+
+
+@requires_redis
+def test_redis_store_ttl():
+    async def test(server):
+        store = RedisStore(server.url)
+        await store.set("short", b"1", 5)
+        await store.set("long", b"2", 60)
+        server.advance(10)
+        assert await store.get("short") is None
+        assert await store.get("long") == b"2"
+        await store.close()
+
+    with_fake_redis(test)
+
+
+@requires_redis
+def test_redis_store_delete_prefix():
+    async def test(server):
+        store = RedisStore(server.url)
+        for key in ("note:1", "note:2", "notes_page:1", "principal:1"):
+            await store.set(key, b"x", 60)
+        await store.delete_prefix("note:")
+        assert await store.get("note:1") is None
+        assert await store.get("note:2") is None
+        assert await store.get("notes_page:1") == b"x"
+        assert await store.get("principal:1") == b"x"
+        await store.close()
+
+    with_fake_redis(test)
+
+
+@requires_redis
+def test_redis_store_counters():
+    async def test(server):
+        store = RedisStore(server.url)
+        assert await store.counter("note#version") == 0
+        assert await store.increment("note#version") == 1
+        assert await store.increment("note#version") == 2
+        assert await store.counter("note#version") == 2
+        await store.close()
+
+    with_fake_redis(test)
+
+
+@requires_redis
+def test_shared_cache_round_trips_json():
+    async def test(server):
+        cache = SharedCache("note", RedisStore(server.url), ttl=60)
+        note = {"note_id": 1, "title": "t", "tag": None}
+        await cache.set(1, note)
+        await cache.set(2, False)
+        await cache.set(3, ([note], 1, None))
+        assert await cache.get(1) == note
+        assert await cache.get(2) is False
+        assert await cache.get(3) == [[note], 1, None]
+        assert await cache.get(4) is None
+        assert server.data[b"note:1"][0].startswith(b"{")
+        await cache.clear()
+        assert await cache.get(1) is None
+        await cache.store.close()
+
+    with_fake_redis(test)
+
+
+@requires_redis
+def test_shared_cache_degrades_to_miss_when_store_is_down():
+    async def test(server):
+        cache = SharedCache("note", RedisStore(server.url), ttl=60)
+        await server.close()
+        await cache.set(1, {"note_id": 1})
+        assert await cache.get(1, "default") == "default"
+        assert cache.stats()["errors"] == 2
+        await cache.store.close()
+        await server.start()
+
+    with_fake_redis(test)
+
+
+@requires_redis
+def test_versioned_cache_bump_hides_entries():
+    async def test(server):
+        cache = VersionedCache(SharedCache("notes_page", RedisStore(server.url), ttl=60))
+        await cache.set("page", [1, 2])
+        assert await cache.get("page") == [1, 2]
+        await cache.bump()
+        assert await cache.get("page") is None
+        assert cache.stats()["version"] == 1
+        await cache.cache.store.close()
+
+    with_fake_redis(test)
+
+
+@requires_redis
+def test_invalidation_bus_reaches_other_workers():
+    async def test(server):
+        buses = [RedisInvalidationBus(server.url) for _ in range(2)]
+        caches = [LocalCache("note", TTLCache(10, 60), bus) for bus in buses]
+        for bus in buses:
+            bus.start()
+
+        async def subscribed():
+            return len(server.subscribers.get(b"cache-invalidation", ())) == 2
+
+        await wait_for(subscribed)
+        for cache in caches:
+            await cache.set(1, {"note_id": 1})
+            await cache.set((1, "page"), [1])
+
+        await caches[0].delete(1)
+
+        async def deleted():
+            return await caches[1].get(1) is None
+
+        await wait_for(deleted)
+        # The sender already applied its own delete and ignores the echo
+        assert await caches[0].get(1) is None
+        assert buses[0].stats()["published"] == 1
+        assert buses[0].stats()["received"] == 0
+
+        await caches[0].increment("version")
+
+        async def bumped():
+            return await caches[1].counter("version") == 1
+
+        await wait_for(bumped)
+        await caches[0].clear()
+
+        async def cleared():
+            return await caches[1].get((1, "page")) is None
+
+        await wait_for(cleared)
+        for bus in buses:
+            await bus.stop()
+
+    with_fake_redis(test)
+
+
+def test_shared_memory_store(tmp_path):
+    async def test():
+        store = SharedMemoryStore(str(tmp_path / "cache"), slots=64, slot_size=256)
+        await store.set("note:1", b"one", 60)
+        await store.set("notes_page:1", b"page", 60)
+        await store.set("expired", b"x", -1)
+        assert await store.get("note:1") == b"one"
+        assert await store.get("expired") is None
+        await store.set("too_large", b"x" * 512, 60)
+        assert await store.get("too_large") is None
+        await store.delete_prefix("note:")
+        assert await store.get("note:1") is None
+        assert await store.get("notes_page:1") == b"page"
+        assert await store.increment("note#version") == 1
+        assert await store.counter("note#version") == 1
+
+    asyncio.run(test())
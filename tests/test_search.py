@@ -0,0 +1,124 @@
+import math
+import pytest
+from utils.search import InvertedIndex, highlight, tokenize
+
+DOCUMENTS = [
+    (1, ("Apple banana", None)),
+    (2, ("apple apple", "cherry")),
+    (3, ("Durian", "")),
+]
+
+
+def loaded_index(documents=DOCUMENTS) -> InvertedIndex:
+    index = InvertedIndex(refresh_seconds=60)
+    index.load(documents, index.generation)
+    return index
+
+
+def note_ids(index: InvertedIndex, query: str) -> list[int]:
+    return [note_id for note_id, _ in index.search(query)]
+
+
+def test_tokenize():
+    assert tokenize("Hello, wörld_2 hello!") == ["hello", "wörld_2", "hello"]
+    assert tokenize(None) == []
+
+
+def test_search_matches_any_term_best_first():
+    index = loaded_index()
+    assert note_ids(index, "apple") == [2, 1]
+    assert note_ids(index, "BANANA durian") == [3, 1]
+    assert note_ids(index, "kiwi") == []
+    assert note_ids(index, "") == []
+    assert InvertedIndex(refresh_seconds=60).search("apple") == []
+
+
+def test_search_bm25_score():
+    index = loaded_index()
+    [(note_id, score)] = index.search("banana")
+    # One of three documents matches; lengths 2, 3, 1 (average 2)
+    idf = math.log(1 + (3 - 1 + 0.5) / (1 + 0.5))
+    length_norm = 1 - InvertedIndex.B + InvertedIndex.B * 2 / 2
+    expected = idf * (InvertedIndex.K1 + 1) / (1 + InvertedIndex.K1 * length_norm)
+    assert note_id == 1
+    assert score == pytest.approx(expected)
+
+
+def test_equal_scores_rank_newest_note_first():
+    index = loaded_index([(1, ("same",)), (5, ("same",)), (3, ("same",))])
+    assert note_ids(index, "same") == [5, 3, 1]
+
+
+def test_add_replaces_and_remove_drops_a_note():
+    index = loaded_index()
+    index.add(1, ("kiwi",))
+    assert note_ids(index, "banana") == []
+    assert note_ids(index, "kiwi") == [1]
+    assert note_ids(index, "apple") == [2]
+
+    index.add(4, ("kiwi kiwi",))
+    assert note_ids(index, "kiwi") == [4, 1]
+
+    index.remove(4)
+    index.remove(1)
+    index.remove(99)
+    assert note_ids(index, "kiwi") == []
+    stats = index.stats()
+    assert stats["documents"] == 2
+    # No empty postings are left behind
+    assert stats["terms"] == 3
+
+
+def test_writes_before_load_are_ignored():
+    index = InvertedIndex(refresh_seconds=60)
+    index.add(1, ("apple",))
+    index.remove(2)
+    assert index.stats()["documents"] == 0
+    assert index.needs_reload()
+
+
+def test_load_that_raced_a_write_stays_stale():
+    index = InvertedIndex(refresh_seconds=60)
+    generation = index.generation
+    index.remove(2)
+    index.load(DOCUMENTS, generation)
+    # Used as is, but reloaded on the next search
+    assert note_ids(index, "cherry") == [2]
+    assert index.needs_reload()
+
+    index.load(DOCUMENTS, index.generation)
+    assert not index.needs_reload()
+    assert index.reloads == 2
+
+
+def test_clear_and_refresh_interval():
+    index = loaded_index()
+    index.clear()
+    assert not index.loaded
+    assert index.needs_reload()
+    assert index.search("apple") == []
+
+    index = InvertedIndex(refresh_seconds=0)
+    index.load(DOCUMENTS, index.generation)
+    assert index.needs_reload()
+
+
+def test_highlight_marks_terms_and_escapes_html():
+    assert (
+        highlight("a <b> & Python rocks, python!", "PYTHON", 100)
+        == "a &lt;b&gt; &amp; <mark>Python</mark> rocks, <mark>python</mark>!"
+    )
+    assert highlight("<i>no match</i>", "kiwi", 100) == "&lt;i&gt;no match&lt;/i&gt;"
+    assert highlight(None, "kiwi", 100) == ""
+    assert highlight("", "kiwi", 100) == ""
+
+
+def test_highlight_window():
+    # The window starts a quarter of its length before the first match, on a
+    # word boundary
+    value = "word " * 20 + "target end"
+    assert highlight(value, "target", 20) == "…word <mark>target</mark> end"
+    # Cut at length, marks that would cross the end are left out
+    assert highlight("python " + "x" * 50, "python", 10) == "<mark>python</mark> xxx…"
+    assert highlight("aaaa python", "python", 8) == "aaaa pyt…"
+    assert highlight("hello world", "kiwi", 5) == "hello…"
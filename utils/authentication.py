@@ -3,6 +3,7 @@ from typing import Optional
 from jose import jwt
 from passlib.context import CryptContext
 from config.settings import SECRET_KEY, ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM
+from utils.hashing import hashing_executor
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -16,6 +17,15 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# Async variants used by request handlers, bcrypt runs in the hashing pool
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_executor.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await hashing_executor.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (
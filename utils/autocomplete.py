@@ -0,0 +1,100 @@
+import heapq
+import time
+from bisect import bisect_left, insort
+from typing import Iterable, Optional
+from config.settings import AUTOCOMPLETE_REFRESH_SECONDS
+
+
+# In-memory prefix index over facet values (tag, note_subject) with their
+# note counts, loaded from the note_facets aggregates. Values are kept sorted
+# by their lowercased form so a prefix is a contiguous range found by
+# bisection. This worker's note writes are applied as deltas (update()), and
+# the index is reloaded at least every refresh_seconds so writes made by
+# other workers show up as well.
+class PrefixIndex:
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.loaded = False
+        self.reloads = 0
+        # Moves on every write, see load()
+        self.generation = 0
+        self._loaded_at: Optional[float] = None
+        self._keys: dict[str, list[tuple[str, str]]] = {}
+        self._counts: dict[str, dict[str, int]] = {}
+
+    def needs_reload(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= self.refresh_seconds
+        )
+
+    def invalidate(self):
+        self.generation += 1
+        self._loaded_at = None
+
+    def load(self, rows: Iterable[tuple[str, str, int]], generation: int):
+        # generation is the one read before rows were queried. If a write came
+        # in since, rows may predate it: the index is used as is but reloaded
+        # on the next lookup.
+        counts: dict[str, dict[str, int]] = {}
+        for facet, value, count in rows:
+            counts.setdefault(facet, {})[value] = int(count)
+        self._counts = counts
+        self._keys = {
+            facet: sorted((value.lower(), value) for value in values)
+            for facet, values in counts.items()
+        }
+        self.loaded = True
+        self.reloads += 1
+        self._loaded_at = time.monotonic() if generation == self.generation else None
+
+    def update(self, old: Optional[dict], new: Optional[dict]):
+        # One note write: the note's facet values before and after it (None
+        # for a create or a delete)
+        self.generation += 1
+        if not self.loaded:
+            return
+        old, new = old or {}, new or {}
+        for facet in old.keys() | new.keys():
+            if old.get(facet) == new.get(facet):
+                continue
+            if old.get(facet) is not None:
+                self._add(facet, old[facet], -1)
+            if new.get(facet) is not None:
+                self._add(facet, new[facet], 1)
+
+    def _add(self, facet: str, value: str, delta: int):
+        counts = self._counts.setdefault(facet, {})
+        keys = self._keys.setdefault(facet, [])
+        key = (value.lower(), value)
+        count = counts.get(value, 0) + delta
+        if value not in counts and count > 0:
+            insort(keys, key)
+        elif value in counts and count <= 0:
+            del keys[bisect_left(keys, key)]
+        if count > 0:
+            counts[value] = count
+        else:
+            counts.pop(value, None)
+
+    def lookup(self, facet: str, prefix: str, limit: int) -> list[dict]:
+        # Most used values first among those starting with prefix (case-insensitive)
+        keys = self._keys.get(facet, [])
+        counts = self._counts.get(facet, {})
+        prefix = prefix.lower()
+        start = bisect_left(keys, (prefix,))
+        end = bisect_left(keys, (prefix + "\U0010ffff",), lo=start)
+        best = heapq.nsmallest(
+            limit, keys[start:end], key=lambda key: (-counts[key[1]], key)
+        )
+        return [{"value": value, "count": counts[value]} for _, value in best]
+
+    def stats(self) -> dict:
+        return {
+            "values": {facet: len(keys) for facet, keys in self._keys.items()},
+            "reloads": self.reloads,
+            "refresh_seconds": self.refresh_seconds,
+        }
+
+
+facet_index = PrefixIndex(AUTOCOMPLETE_REFRESH_SECONDS)
@@ -0,0 +1,174 @@
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Hashable, Optional
+from config.settings import (
+    CACHE_BACKEND,
+    CACHE_REDIS_URL,
+    CACHE_INVALIDATION_URL,
+    CACHE_SHM_PATH,
+    CACHE_SHM_SLOTS,
+    CACHE_SHM_SLOT_SIZE,
+    PRINCIPAL_CACHE_SIZE,
+    PRINCIPAL_CACHE_TTL,
+    NOTE_CACHE_SIZE,
+    NOTE_CACHE_TTL,
+    NOTES_PAGE_CACHE_SIZE,
+    NOTES_PAGE_CACHE_TTL,
+)
+from utils.cache_backends import (
+    LocalCache,
+    RedisInvalidationBus,
+    RedisStore,
+    SharedCache,
+    SharedMemoryStore,
+)
+
+
+# Bounded LRU cache whose entries also expire after a TTL (seconds).
+# Meant for use from the event loop, so it takes no locks.
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._counters: dict[str, int] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # Counters are kept apart from the entries so they are never evicted
+    def counter(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    def increment(self, name: str):
+        self._counters[name] = self._counters.get(name, 0) + 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+# Cache whose keys are scoped to a version number kept in the cache's own
+# counters. bump() makes every existing entry unreachable at once; they then
+# age out of the LRU (or expire from a shared store).
+class VersionedCache:
+    def __init__(self, cache):
+        self.cache = cache
+        self.last_version = 0
+
+    async def version(self) -> int:
+        self.last_version = await self.cache.counter("version")
+        return self.last_version
+
+    async def bump(self):
+        await self.cache.increment("version")
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        return await self.cache.get((await self.version(), key), default)
+
+    async def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        version: Optional[int] = None,
+    ):
+        # Pass the version read before loading value, so a value loaded
+        # across a bump lands under the old, unreachable version
+        if version is None:
+            version = await self.version()
+        await self.cache.set((version, key), value, ttl)
+
+    async def delete(self, key: Hashable):
+        await self.cache.delete((await self.version(), key))
+
+    def stats(self) -> dict:
+        return {**self.cache.stats(), "version": self.last_version}
+
+
+# CACHE_BACKEND picks where the caches below live: "memory" (per process,
+# optionally kept coherent through CACHE_INVALIDATION_URL), "mmap" (shared
+# by the workers on one host) or "redis" (shared by every host)
+shared_store = None
+if CACHE_BACKEND == "mmap":
+    shared_store = SharedMemoryStore(CACHE_SHM_PATH, CACHE_SHM_SLOTS, CACHE_SHM_SLOT_SIZE)
+elif CACHE_BACKEND == "redis":
+    shared_store = RedisStore(CACHE_REDIS_URL)
+
+invalidation_bus = None
+if CACHE_BACKEND == "memory" and CACHE_INVALIDATION_URL:
+    invalidation_bus = RedisInvalidationBus(CACHE_INVALIDATION_URL)
+
+
+def make_cache(namespace: str, maxsize: int, ttl: float):
+    if shared_store is not None:
+        return SharedCache(namespace, shared_store, ttl, enabled=maxsize > 0)
+    return LocalCache(namespace, TTLCache(maxsize, ttl), invalidation_bus)
+
+
+# Set when the current request is answered from note_cache or
+# notes_page_cache. Such bodies repeat, so the compression middleware keeps
+# their compressed form (utils/compression.py compressed_body_cache).
+served_from_cache: ContextVar[bool] = ContextVar("served_from_cache", default=False)
+
+# Stored for lookups that found nothing, with NEGATIVE_CACHE_TTL. A plain
+# False so it survives the JSON round trip through the shared backends.
+NOT_FOUND = False
+
+# Authenticated user ids that are known to exist (or NOT_FOUND), see get_current_user
+principal_cache = make_cache("principal", PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+
+# Notes by note_id (or NOT_FOUND), see find_note_by_id
+note_cache = make_cache("note", NOTE_CACHE_SIZE, NOTE_CACHE_TTL)
+
+# find_all pages, versioned by note writes
+notes_page_cache = VersionedCache(
+    make_cache("notes_page", NOTES_PAGE_CACHE_SIZE, NOTES_PAGE_CACHE_TTL)
+)
@@ -0,0 +1,411 @@
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Callable, Hashable, Optional
+
+try:
+    import orjson
+except ImportError:  # optional, see commands.md
+    orjson = None
+
+try:
+    from redis import asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:  # optional, see commands.md
+    aioredis = None
+    RedisError = OSError
+
+# Shared cache backends. Stores hold bytes under string keys and are shared
+# by every worker process: SharedMemoryStore through an mmap'ed file on one
+# host, RedisStore through any server speaking the Redis protocol.
+# SharedCache puts the TTLCache interface on top of a store, and LocalCache
+# puts it on top of a per-process TTLCache, optionally kept coherent across
+# workers by publishing its invalidations on a RedisInvalidationBus. Both
+# are awaited, so a shared store never blocks the event loop.
+
+
+class CacheUnavailable(Exception):
+    pass
+
+
+class RedisStore:
+    def __init__(self, url: str, timeout: float = 1.0):
+        if aioredis is None:
+            raise CacheUnavailable("The redis package is required for the Redis cache")
+        # Pooled asyncio client, store calls never block the event loop
+        self._client = aioredis.from_url(
+            url, protocol=2, socket_timeout=timeout, socket_connect_timeout=timeout
+        )
+
+    async def _command(self, *args) -> Any:
+        try:
+            return await self._client.execute_command(*args)
+        except (RedisError, OSError) as e:
+            raise CacheUnavailable(str(e))
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._command("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self._command("SET", key, value, "PX", max(int(ttl * 1000), 1))
+
+    async def delete(self, key: str):
+        await self._command("DEL", key)
+
+    async def delete_prefix(self, prefix: str):
+        cursor = 0
+        while True:
+            cursor, keys = await self._command(
+                "SCAN", cursor, "MATCH", f"{prefix}*", "COUNT", 1000
+            )
+            if keys:
+                await self._command("DEL", *keys)
+            if int(cursor) == 0:
+                break
+
+    async def counter(self, key: str) -> int:
+        value = await self._command("GET", key)
+        return int(value) if value is not None else 0
+
+    async def increment(self, key: str) -> int:
+        return await self._command("INCR", key)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+# File layout: COUNTER_SLOTS counter records, then `slots` entry records of
+# slot_size bytes each. An entry lives in the slot its key hashes to, a new
+# key hashing to an occupied slot replaces the old entry.
+ENTRY_HEADER = struct.Struct("<16sdHI")  # key digest, expires at, key length, value length
+COUNTER = struct.Struct("<16sq")  # key digest, value
+COUNTER_SLOTS = 256
+
+
+# The async methods do no I/O wait beyond a short flock, so they run inline
+# on the event loop
+class SharedMemoryStore:
+    def __init__(self, path: str, slots: int, slot_size: int):
+        import fcntl  # POSIX only
+
+        self._fcntl = fcntl
+        self.slots = slots
+        self.slot_size = slot_size
+        self.overwrites = 0
+        self._entries_offset = COUNTER_SLOTS * COUNTER.size
+        size = self._entries_offset + slots * slot_size
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked(fcntl.LOCK_EX):
+            if os.fstat(self._fd).st_size != size:
+                os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+
+    @contextmanager
+    def _locked(self, mode: int):
+        self._fcntl.flock(self._fd, mode)
+        try:
+            yield
+        finally:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+
+    @staticmethod
+    def _digest(key: str) -> bytes:
+        return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+    def _entry_offset(self, digest: bytes) -> int:
+        index = int.from_bytes(digest[:8], "little") % self.slots
+        return self._entries_offset + index * self.slot_size
+
+    async def get(self, key: str) -> Optional[bytes]:
+        digest = self._digest(key)
+        offset = self._entry_offset(digest)
+        with self._locked(self._fcntl.LOCK_SH):
+            stored, expires_at, key_length, value_length = ENTRY_HEADER.unpack_from(
+                self._map, offset
+            )
+            if stored != digest or expires_at <= time.time():
+                return None
+            start = offset + ENTRY_HEADER.size + key_length
+            return self._map[start : start + value_length]
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        digest = self._digest(key)
+        key_bytes = key.encode()
+        if ENTRY_HEADER.size + len(key_bytes) + len(value) > self.slot_size:
+            return  # Too large for a slot, not cached
+        offset = self._entry_offset(digest)
+        with self._locked(self._fcntl.LOCK_EX):
+            stored, expires_at, _, _ = ENTRY_HEADER.unpack_from(self._map, offset)
+            if stored != digest and expires_at > time.time():
+                self.overwrites += 1
+            ENTRY_HEADER.pack_into(
+                self._map, offset, digest, time.time() + ttl, len(key_bytes), len(value)
+            )
+            start = offset + ENTRY_HEADER.size
+            self._map[start : start + len(key_bytes) + len(value)] = key_bytes + value
+
+    async def delete(self, key: str):
+        digest = self._digest(key)
+        offset = self._entry_offset(digest)
+        with self._locked(self._fcntl.LOCK_EX):
+            if ENTRY_HEADER.unpack_from(self._map, offset)[0] == digest:
+                ENTRY_HEADER.pack_into(self._map, offset, bytes(16), 0.0, 0, 0)
+
+    async def delete_prefix(self, prefix: str):
+        prefix_bytes = prefix.encode()
+        with self._locked(self._fcntl.LOCK_EX):
+            for index in range(self.slots):
+                offset = self._entries_offset + index * self.slot_size
+                _, _, key_length, _ = ENTRY_HEADER.unpack_from(self._map, offset)
+                start = offset + ENTRY_HEADER.size
+                if self._map[start : start + key_length].startswith(prefix_bytes):
+                    ENTRY_HEADER.pack_into(self._map, offset, bytes(16), 0.0, 0, 0)
+
+    def _counter_offset(self, digest: bytes) -> int:
+        # Open addressing, counters are few and never removed
+        start = int.from_bytes(digest[:8], "little") % COUNTER_SLOTS
+        for probe in range(COUNTER_SLOTS):
+            offset = ((start + probe) % COUNTER_SLOTS) * COUNTER.size
+            stored, _ = COUNTER.unpack_from(self._map, offset)
+            if stored in (digest, bytes(16)):
+                return offset
+        raise CacheUnavailable("Shared memory counter area is full")
+
+    async def counter(self, key: str) -> int:
+        digest = self._digest(key)
+        with self._locked(self._fcntl.LOCK_SH):
+            stored, value = COUNTER.unpack_from(self._map, self._counter_offset(digest))
+            return value if stored == digest else 0
+
+    async def increment(self, key: str) -> int:
+        digest = self._digest(key)
+        with self._locked(self._fcntl.LOCK_EX):
+            offset = self._counter_offset(digest)
+            stored, value = COUNTER.unpack_from(self._map, offset)
+            value = value + 1 if stored == digest else 1
+            COUNTER.pack_into(self._map, offset, digest, value)
+            return value
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# Values in shared stores are JSON, never pickle, so whoever can write to the
+# store cannot run code in the workers. Tuples come back as lists and
+# datetimes as ISO 8601 strings, which the response models accept.
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_json_default, separators=(",", ":")).encode()
+
+
+def loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+# TTLCache interface over a shared store. Values are stored as JSON, and a
+# store failure degrades to a cache miss rather than failing the request.
+class SharedCache:
+    def __init__(self, namespace: str, store, ttl: float, enabled: bool = True):
+        self.namespace = namespace
+        self.store = store
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.namespace}:{key!r}"
+
+    async def _call(self, fn: Callable, *args, default: Any = None) -> Any:
+        try:
+            return await fn(*args)
+        except CacheUnavailable:
+            self.errors += 1
+            return default
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        data = await self._call(self.store.get, self._key(key)) if self.enabled else None
+        if data is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return loads(data)
+
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if self.enabled:
+            try:
+                data = dumps(value)
+            except TypeError:
+                self.errors += 1
+                return
+            await self._call(
+                self.store.set, self._key(key), data, self.ttl if ttl is None else ttl
+            )
+
+    async def delete(self, key: Hashable):
+        await self._call(self.store.delete, self._key(key))
+
+    async def clear(self):
+        await self._call(self.store.delete_prefix, f"{self.namespace}:")
+
+    async def counter(self, name: str) -> int:
+        return await self._call(self.store.counter, f"{self.namespace}#{name}", default=0)
+
+    async def increment(self, name: str):
+        await self._call(self.store.increment, f"{self.namespace}#{name}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.store).__name__,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "errors": self.errors,
+        }
+
+
+def _hashable(key: Any) -> Hashable:
+    # JSON turns tuple keys into lists
+    if isinstance(key, list):
+        return tuple(_hashable(item) for item in key)
+    return key
+
+
+# Fans cache invalidations out to every worker over Redis pub/sub. The
+# subscriber runs as a task on the event loop, so the caches are only ever
+# touched from the loop thread.
+class RedisInvalidationBus:
+    def __init__(self, url: str, channel: str = "cache-invalidation"):
+        self.url = url
+        self.channel = channel
+        self.sender = uuid.uuid4().hex
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+        self._caches: dict[str, Any] = {}
+        self._publisher = RedisStore(url)
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, namespace: str, cache):
+        self._caches[namespace] = cache
+
+    async def publish(self, namespace: str, op: str, key: Any = None):
+        message = json.dumps(
+            {"sender": self.sender, "namespace": namespace, "op": op, "key": key}
+        )
+        try:
+            await self._publisher._command("PUBLISH", self.channel, message)
+            self.published += 1
+        except CacheUnavailable:
+            self.errors += 1
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._publisher.close()
+
+    async def _listen(self):
+        while True:
+            client = aioredis.from_url(self.url, protocol=2)  # type: ignore
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._apply(message["data"])
+            except (RedisError, OSError):
+                self.errors += 1
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+    def _apply(self, payload: bytes):
+        message = json.loads(payload)
+        if message["sender"] == self.sender:
+            return
+        cache = self._caches.get(message["namespace"])
+        if cache is not None:
+            self.received += 1
+            cache.apply(message["op"], _hashable(message["key"]))
+
+    def stats(self) -> dict:
+        return {
+            "channel": self.channel,
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors,
+        }
+
+
+# A per-process cache (TTLCache) behind the awaitable cache interface. With a
+# bus, its invalidations also reach the other workers.
+class LocalCache:
+    def __init__(
+        self, namespace: str, cache, bus: Optional[RedisInvalidationBus] = None
+    ):
+        self.namespace = namespace
+        self.cache = cache
+        self.bus = bus
+        if bus is not None:
+            bus.register(namespace, self)
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        return self.cache.get(key, default)
+
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self.cache.set(key, value, ttl)
+
+    async def delete(self, key: Hashable):
+        self.cache.delete(key)
+        if self.bus is not None:
+            await self.bus.publish(self.namespace, "delete", key)
+
+    async def clear(self):
+        self.cache.clear()
+        if self.bus is not None:
+            await self.bus.publish(self.namespace, "clear")
+
+    async def counter(self, name: str) -> int:
+        return self.cache.counter(name)
+
+    async def increment(self, name: str):
+        self.cache.increment(name)
+        if self.bus is not None:
+            await self.bus.publish(self.namespace, "increment", name)
+
+    def apply(self, op: str, key: Any):
+        # Invalidation received from another worker
+        if op == "delete":
+            self.cache.delete(key)
+        elif op == "clear":
+            self.cache.clear()
+        elif op == "increment":
+            self.cache.increment(key)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
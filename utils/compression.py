@@ -0,0 +1,193 @@
+import gzip
+import hashlib
+import zlib
+from typing import Callable, Dict, Optional, Sequence
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config.settings import (
+    BROTLI_QUALITY,
+    COMPRESSION_CACHE_SIZE,
+    COMPRESSION_CACHE_TTL,
+    GZIP_LEVEL,
+    ZSTD_LEVEL,
+)
+from utils.cache import TTLCache, served_from_cache
+
+try:
+    import zstandard
+except ImportError:  # optional, see commands.md
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # optional, see commands.md
+    brotli = None
+
+
+# Incremental compressors for streamed bodies. Each chunk is flushed so
+# NDJSON batches reach the client as soon as they are produced.
+class GzipStream:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class ZstdStream:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()  # type: ignore
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK  # type: ignore
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)  # type: ignore
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+# Content-Encoding -> (one-shot compress, streaming compressor)
+CODECS: Dict[str, tuple[Callable[[bytes], bytes], Callable]] = {
+    "gzip": (lambda body: gzip.compress(body, GZIP_LEVEL, mtime=0), GzipStream),
+}
+if zstandard is not None:
+    CODECS["zstd"] = (zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress, ZstdStream)
+if brotli is not None:
+    CODECS["br"] = (lambda body: brotli.compress(body, quality=BROTLI_QUALITY), BrotliStream)
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# Compressed bodies by (encoding, body digest). Responses served from the
+# note and notes page caches repeat the same body, so they are compressed
+# once; every other body is compressed directly, without hashing or storing.
+compressed_body_cache = TTLCache(COMPRESSION_CACHE_SIZE, COMPRESSION_CACHE_TTL)
+
+
+def negotiate(accept_encoding: str, encodings: Sequence[str]) -> Optional[str]:
+    # Highest q-value wins, ties go to the earlier entry of encodings
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_body(encoding: str, body: bytes) -> bytes:
+    if not served_from_cache.get():
+        return CODECS[encoding][0](body)
+    key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+    compressed = compressed_body_cache.get(key)
+    if compressed is None:
+        compressed = CODECS[encoding][0](body)
+        compressed_body_cache.set(key, compressed)
+    return compressed
+
+
+# Compresses JSON/NDJSON/text responses with the best encoding the client
+# accepts. Complete bodies under minimum_size are sent as is; streamed
+# bodies are always compressed since their size is not known up front.
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int, encodings: Sequence[str]):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = [encoding for encoding in encodings if encoding in CODECS]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        encoding = negotiate(accept_encoding, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = CompressingResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class CompressingResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.stream = None
+
+    def compressible(self, headers: MutableHeaders) -> bool:
+        return (
+            "content-encoding" not in headers
+            and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+        )
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start_message is not None:
+            # First body message: decide once for the whole response
+            start_message, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start_message["headers"])
+            if not self.compressible(headers) or (
+                not more_body and len(body) < self.minimum_size
+            ):
+                self.passthrough = True
+                await self._send(start_message)
+                await self._send(message)
+                return
+
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body:
+                body = compress_body(self.encoding, body)
+                headers["Content-Length"] = str(len(body))
+                await self._send(start_message)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+
+            del headers["Content-Length"]
+            self.stream = CODECS[self.encoding][1]()
+            await self._send(start_message)
+
+        chunk = self.stream.compress(body) if body else b""  # type: ignore
+        if not more_body:
+            chunk += self.stream.finish()  # type: ignore
+        await self._send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
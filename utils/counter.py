@@ -0,0 +1,39 @@
+import time
+from typing import Optional
+
+
+# Row count kept in process and adjusted by the write paths, recounted from
+# the database every reconcile_interval seconds so drift from other workers
+# (or writes made outside the API) is bounded.
+class MaintainedCounter:
+    def __init__(self, reconcile_interval: float):
+        self.reconcile_interval = reconcile_interval
+        self.value: Optional[int] = None
+        self.reconciliations = 0
+        self._reconciled_at = 0.0
+
+    def needs_reconcile(self) -> bool:
+        return (
+            self.value is None
+            or time.monotonic() - self._reconciled_at >= self.reconcile_interval
+        )
+
+    def reconcile(self, value: int):
+        self.value = value
+        self.reconciliations += 1
+        self._reconciled_at = time.monotonic()
+
+    def invalidate(self):
+        # For writes whose row delta is unknown; the next read recounts
+        self.value = None
+
+    def add(self, delta: int):
+        if self.value is not None:
+            self.value = max(self.value + delta, 0)
+
+    def stats(self) -> dict:
+        return {
+            "value": self.value,
+            "reconcile_interval": self.reconcile_interval,
+            "reconciliations": self.reconciliations,
+        }
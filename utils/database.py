@@ -0,0 +1,54 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from sqlalchemy.sql.elements import TextClause
+from config.db import DBSession, USE_SQLITE
+from repositories.sqlite import translate_call
+
+
+# Helpers so services work with both sync and async sessions
+async def execute(db: DBSession, statement, params: Optional[dict] = None):
+    if USE_SQLITE and isinstance(statement, TextClause):
+        statements = translate_call(statement.text)
+        if statements:
+            # Multi-statement procedures return the last statement's result
+            for sqlite_statement in statements:
+                result = await _execute(db, sqlite_statement, params)
+            return result
+    return await _execute(db, statement, params)
+
+
+async def _execute(db: DBSession, statement, params: Optional[dict] = None):
+    if isinstance(db, AsyncSession):
+        return await db.execute(statement, params)
+    return db.execute(statement, params)
+
+
+# Yields rows in batches of batch_size from a server-side (unbuffered) cursor,
+# so the full result set is never held in memory. Sync sessions fetch in the
+# threadpool to keep the event loop free.
+async def stream(db: DBSession, statement, batch_size: int):
+    options = {"yield_per": batch_size}
+    if isinstance(db, AsyncSession):
+        async_result = await db.stream(statement, execution_options=options)
+        async for rows in async_result.partitions():
+            yield rows
+        return
+
+    result = await run_in_threadpool(db.execute, statement, execution_options=options)
+    async for rows in iterate_in_threadpool(result.partitions()):
+        yield rows
+
+
+async def commit(db: DBSession):
+    if isinstance(db, AsyncSession):
+        await db.commit()
+    else:
+        db.commit()
+
+
+async def rollback(db: DBSession):
+    if isinstance(db, AsyncSession):
+        await db.rollback()
+    else:
+        db.rollback()
@@ -1,16 +1,23 @@
+from contextlib import asynccontextmanager
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
 from jose import JWTError, jwt
-from config.settings import SECRET_KEY, ALGORITHM
+from config.settings import SECRET_KEY, ALGORITHM, DB_ASYNC, NEGATIVE_CACHE_TTL
 from repositories.user import get_user_by_id
 from schemas.auth import TokenData
-from config.db import SessionLocal
+from config.db import SessionLocal, AsyncSessionLocal, DBSession, read_route
+from utils.cache import NOT_FOUND, principal_cache
 from utils.security import oauth2_scheme
+from utils.singleflight import read_flight
 
 
 
-# Dependency to get DB session
-def get_db():
+# Dependency to get DB session (AsyncSession when DB_ASYNC is enabled)
+async def get_db():
+    if DB_ASYNC:
+        async with AsyncSessionLocal() as db:  # type: ignore
+            yield db
+        return
+
     db = SessionLocal()
     try:
         yield db
@@ -18,8 +25,14 @@ def get_db():
         db.close()
 
 
+# get_db as a context manager, for work that outlives the request's
+# dependencies (the session from Depends(get_db) is closed before a
+# StreamingResponse body is sent)
+open_db = asynccontextmanager(get_db)
+
+
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+    token: str = Depends(oauth2_scheme), db: DBSession = Depends(get_db)
 ) -> TokenData:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]) # type: ignore
@@ -36,9 +49,32 @@ async def get_current_user(
             detail="Not authenticated",
         )
 
-    user = get_user_by_id(db, user_id)
-    if not user:
+    # Lets the routing session keep this user's reads on the primary after a write
+    db.info["user_id"] = user_id
+
+    # Skip the GetUserById round trip for recently seen (or recently missing) users
+    known = await principal_cache.get(user_id)
+    if known is None:
+        known = await read_flight.do(
+            ("user", read_route(db), user_id), lambda: _load_principal(db, user_id)
+        )
+    if known is NOT_FOUND:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
     return TokenData(user_id=user_id)
+
+
+async def _load_principal(db: DBSession, user_id: int):
+    # delete_user bumps the principal version before dropping the entry. If it
+    # moved since the version was read, the user may have been deleted during
+    # the load, so the loaded entry must not outlive that delete.
+    version = await principal_cache.counter("version")
+    user = await get_user_by_id(db, user_id)
+    if user:
+        await principal_cache.set(user_id, True)
+    else:
+        await principal_cache.set(user_id, NOT_FOUND, NEGATIVE_CACHE_TTL)
+    if await principal_cache.counter("version") != version:
+        await principal_cache.delete(user_id)
+    return True if user else NOT_FOUND
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+from fastapi import HTTPException, status
+from config.constants import ERROR_HASHING_BUSY
+from config.settings import HASH_WORKERS, HASH_QUEUE_SIZE
+from utils.metrics import Histogram
+
+
+def _timed_call(fn: Callable, *args):
+    # Runs inside the worker process; the run time lets the caller split
+    # the total latency into queue wait and hashing time
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+# Process pool for bcrypt work, so hashing never runs on the event loop.
+# At most workers + max_queue calls are accepted at once, anything beyond
+# that is rejected straight away with a 503 instead of piling up.
+class HashingExecutor:
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.rejected = 0
+        self.wait_time = Histogram()
+        self.run_time = Histogram()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self.in_flight - self.workers, 0)
+
+    async def run(self, fn: Callable, *args):
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=ERROR_HASHING_BUSY,
+                headers={"Retry-After": "1"},
+            )
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        self.in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, run_time = await loop.run_in_executor(
+                self._pool, _timed_call, fn, *args
+            )
+        finally:
+            self.in_flight -= 1
+
+        self.run_time.observe(run_time)
+        self.wait_time.observe(max(time.perf_counter() - submitted - run_time, 0.0))
+        return result
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "rejected": self.rejected,
+            "wait_time": self.wait_time.snapshot(),
+            "run_time": self.run_time.snapshot(),
+        }
+
+
+hashing_executor = HashingExecutor(HASH_WORKERS, HASH_QUEUE_SIZE)
@@ -0,0 +1,106 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional, Sequence
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+# Upper bounds in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.counts[bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.total += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self.counts)
+            count, total = self.count, self.total
+
+        # Cumulative counts, Prometheus style
+        buckets, running = {}, 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            running += bucket_count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = running
+        return {
+            "count": count,
+            "sum": round(total, 6),
+            "avg": round(total / count, 6) if count else 0.0,
+            "buckets": buckets,
+        }
+
+
+# Connection pool telemetry for one engine. pool_class() wraps the pool so
+# time spent waiting for a connection is observed, listen() counts pool events.
+class PoolMetrics:
+    def __init__(self):
+        self.checkout_wait = Histogram()
+        self.connects = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self._engine: Optional[Engine] = None
+
+    def pool_class(self, base: type[Pool]) -> type[Pool]:
+        metrics = self
+
+        class TimedPool(base):  # type: ignore
+            def _do_get(self):
+                start = time.perf_counter()
+                try:
+                    return super()._do_get()
+                except PoolTimeoutError:
+                    metrics.timeouts += 1
+                    raise
+                finally:
+                    metrics.checkout_wait.observe(time.perf_counter() - start)
+
+        return TimedPool
+
+    def listen(self, engine: Engine):
+        self._engine = engine
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        event.listen(engine, "soft_invalidate", self._on_invalidate)
+
+    def _on_connect(self, *args):
+        self.connects += 1
+
+    def _on_checkout(self, *args):
+        self.checkouts += 1
+
+    def _on_invalidate(self, *args):
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        stats: dict = {}
+        pool = self._engine.pool if self._engine is not None else None
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=pool.overflow(),
+            )
+        stats.update(
+            connects=self.connects,
+            checkouts=self.checkouts,
+            timeouts=self.timeouts,
+            invalidations=self.invalidations,
+            checkout_wait=self.checkout_wait.snapshot(),
+        )
+        return stats
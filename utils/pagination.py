@@ -0,0 +1,20 @@
+import base64
+import binascii
+import json
+from config.constants import ERROR_INVALID_CURSOR
+
+
+# Keyset cursors are an opaque, url-safe encoding of the last row's
+# (timestamp, note_id), the seek position for the next page.
+def encode_cursor(timestamp, note_id: int) -> str:
+    raw = json.dumps([str(timestamp), note_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, note_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(timestamp), int(note_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError(ERROR_INVALID_CURSOR)
@@ -0,0 +1,19 @@
+from fastapi.responses import JSONResponse, ORJSONResponse
+from config.settings import JSON_RESPONSE
+
+try:
+    import orjson
+except ImportError:  # optional, see commands.md
+    orjson = None
+
+
+# Response class for every route. Bodies reach it already in JSON form
+# (response_model serialization turns datetimes into ISO 8601 strings), and
+# orjson writes any datetime left in the content the same way.
+def get_default_response_class():
+    if JSON_RESPONSE == "orjson" and orjson is not None:
+        return ORJSONResponse
+    return JSONResponse
+
+
+default_response_class = get_default_response_class()
@@ -0,0 +1,150 @@
+import html
+import math
+import re
+import time
+from collections import Counter
+from typing import Iterable, Optional
+from config.settings import SEARCH_INDEX_REFRESH_SECONDS
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(value: Optional[str]) -> list[str]:
+    return TOKEN_PATTERN.findall(value.lower()) if value else []
+
+
+# In-process full-text engine for the SQLite stand-in (MySQL uses its FULLTEXT
+# index, see migrations/versions/0007). Postings map a term to {note_id: term
+# frequency}; matches are ranked with BM25. The index is filled from the
+# notes table on first use and kept up to date by this worker's note writes.
+# It is reloaded at least every refresh_seconds, so writes made by other
+# workers or outside the app show up too.
+class InvertedIndex:
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.loaded = False
+        self.reloads = 0
+        # Moves on every write, see load()
+        self.generation = 0
+        self._loaded_at: Optional[float] = None
+        self._postings: dict[str, dict[int, int]] = {}
+        self._lengths: dict[int, int] = {}
+        self._terms: dict[int, tuple[str, ...]] = {}
+
+    def needs_reload(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= self.refresh_seconds
+        )
+
+    def invalidate(self):
+        self.generation += 1
+        self._loaded_at = None
+
+    def load(
+        self, documents: Iterable[tuple[int, Iterable[Optional[str]]]], generation: int
+    ):
+        # generation is the one read before documents were queried. If a write
+        # came in since, documents may predate it: the index is used as is but
+        # reloaded on the next search.
+        self._reset()
+        for note_id, texts in documents:
+            self._add(note_id, texts)
+        self.loaded = True
+        self.reloads += 1
+        self._loaded_at = time.monotonic() if generation == self.generation else None
+
+    def clear(self):
+        self._reset()
+        self.loaded = False
+        self.invalidate()
+
+    def _reset(self):
+        self._postings.clear()
+        self._lengths.clear()
+        self._terms.clear()
+
+    # add/remove only update a loaded index, so writes cost nothing where
+    # search runs on MySQL
+    def add(self, note_id: int, texts: Iterable[Optional[str]]):
+        self.generation += 1
+        if self.loaded:
+            self._remove(note_id)
+            self._add(note_id, texts)
+
+    def remove(self, note_id: int):
+        self.generation += 1
+        if self.loaded:
+            self._remove(note_id)
+
+    def _add(self, note_id: int, texts: Iterable[Optional[str]]):
+        terms = Counter(term for value in texts for term in tokenize(value))
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[note_id] = frequency
+        self._lengths[note_id] = sum(terms.values())
+        self._terms[note_id] = tuple(terms)
+
+    def _remove(self, note_id: int):
+        self._lengths.pop(note_id, None)
+        for term in self._terms.pop(note_id, ()):
+            del self._postings[term][note_id]
+            if not self._postings[term]:
+                del self._postings[term]
+
+    def search(self, query: str) -> list[tuple[int, float]]:
+        # Any query term matches (like natural language mode), best first
+        documents = len(self._lengths)
+        if not documents:
+            return []
+        average_length = sum(self._lengths.values()) / documents
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term, {})
+            idf = math.log(1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5))
+            for note_id, frequency in postings.items():
+                length_norm = 1 - self.B + self.B * self._lengths[note_id] / average_length
+                scores[note_id] = scores.get(note_id, 0.0) + idf * frequency * (
+                    self.K1 + 1
+                ) / (frequency + self.K1 * length_norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "documents": len(self._lengths),
+            "terms": len(self._postings),
+            "reloads": self.reloads,
+            "refresh_seconds": self.refresh_seconds,
+        }
+
+
+search_index = InvertedIndex(SEARCH_INDEX_REFRESH_SECONDS)
+
+
+# HTML-escaped window of value around the first query term, with every term
+# wrapped in <mark>
+def highlight(value: Optional[str], query: str, length: int) -> str:
+    if not value:
+        return ""
+    terms = set(tokenize(query))
+    matches = [
+        match for match in TOKEN_PATTERN.finditer(value) if match.group().lower() in terms
+    ]
+    start = max(matches[0].start() - length // 4, 0) if matches else 0
+    if start > 0:
+        # Start on a word boundary
+        start = value.rfind(" ", 0, start) + 1
+    end = min(start + length, len(value))
+
+    parts, position = [], start
+    for match in matches:
+        if match.start() < start or match.end() > end:
+            continue
+        parts.append(html.escape(value[position : match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(value[position:end]))
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(value) else "")
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+# Coalesces concurrent identical reads: the first caller for a key runs its
+# call, callers arriving while it is in flight await the same result (or
+# exception) instead of issuing their own query. Nothing is kept once the
+# call finishes, caching stays the job of utils/cache.py.
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is not None:
+            self.shared += 1
+            try:
+                # shield keeps a cancelled follower from cancelling the leader's call
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # The leader went away mid-call, run our own call instead
+                if not task.cancelled():
+                    raise
+
+        task = asyncio.ensure_future(fn())
+        self._calls[key] = task
+        self.calls += 1
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return await task
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "shared": self.shared,
+        }
+
+
+read_flight = SingleFlight()